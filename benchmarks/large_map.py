@@ -0,0 +1,59 @@
+"""Step and reset time of mode='large' as the map area grows.
+
+With chunked active simulation the step time should stay roughly flat from
+64x64 to 256x256, while reset time grows with the area (world generation).
+
+  python -m benchmarks.large_map --areas 64 128 256 --steps 1000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import mini_crafter
+
+
+def measure(area, steps, resets, seed):
+  env = mini_crafter.Env(mode='large', area=(area, area), seed=seed)
+  reset_times = []
+  for _ in range(resets):
+    start = time.perf_counter()
+    env.reset()
+    reset_times.append(time.perf_counter() - start)
+  rng = np.random.RandomState(seed)
+  actions = rng.randint(0, env.action_space.n, steps)
+  # Only the steps are timed; resets at episode ends are measured above.
+  elapsed = 0.0
+  for action in actions:
+    start = time.perf_counter()
+    _, _, done, _ = env.step(action)
+    elapsed += time.perf_counter() - start
+    if done:
+      env.reset()
+  step_time = elapsed / steps
+  return {
+      'area': area,
+      'objects': len(env._world.objects),
+      'step_ms': 1000 * step_time,
+      'reset_ms': 1000 * float(np.median(reset_times)),
+  }
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument('--areas', type=int, nargs='+', default=[64, 128, 256])
+  parser.add_argument('--steps', type=int, default=1000)
+  parser.add_argument('--resets', type=int, default=3)
+  parser.add_argument('--seed', type=int, default=0)
+  args = parser.parse_args()
+  print(f'{"area":>9} {"objects":>8} {"step ms":>8} {"reset ms":>9}')
+  for area in args.areas:
+    result = measure(area, args.steps, args.resets, args.seed)
+    print(
+        f'{area:>4}x{area:<4} {result["objects"]:>8} '
+        f'{result["step_ms"]:>8.3f} {result["reset_ms"]:>9.1f}')
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,67 @@
+"""Import and construction latency of mini_crafter in fresh interpreters.
+
+Every sample starts a new Python process, as a short-lived evaluation worker
+or a spawned process would, and reports the median over all runs.
+
+  python -m benchmarks.startup --runs 10
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+SNIPPET = '''
+import time
+start = time.perf_counter()
+import mini_crafter
+imported = time.perf_counter()
+env = mini_crafter.Env()
+constructed = time.perf_counter()
+env = mini_crafter.Env()
+again = time.perf_counter()
+env.reset()
+reset = time.perf_counter()
+print(imported - start, constructed - imported, again - constructed,
+      reset - again)
+'''
+
+
+def measure(runs):
+  samples = []
+  for _ in range(runs):
+    output = subprocess.run(
+        [sys.executable, '-c', SNIPPET], check=True, capture_output=True,
+        text=True).stdout
+    samples.append([float(x) for x in output.split()])
+  samples = 1000 * np.median(samples, 0)
+  # Wall time of the whole command, including interpreter startup.
+  command = []
+  for _ in range(runs):
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, '-c', 'import mini_crafter'], check=True,
+        capture_output=True)
+    command.append(time.perf_counter() - start)
+  return {
+      'command_ms': 1000 * float(np.median(command)),
+      'import_ms': samples[0],
+      'first_env_ms': samples[1],
+      'next_env_ms': samples[2],
+      'first_reset_ms': samples[3],
+  }
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument('--runs', type=int, default=10)
+  args = parser.parse_args()
+  result = measure(args.runs)
+  for key, value in result.items():
+    print(f'{key:>16} {value:8.1f}')
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,223 @@
+"""Throughput and latency suite for steps, resets, rendering and recording.
+
+`run` measures every benchmark and writes one JSON file; `compare` flags
+metrics that got worse by more than a threshold between two such files, or
+that are missing from the second one, and exits with status 1 if any did.
+Metrics ending in _per_sec are better when higher, all others (times,
+worldgen attempts, dropped frames) when lower.
+
+  python -m benchmarks.suite run --out before.json
+  python -m benchmarks.suite run --out after.json
+  python -m benchmarks.suite compare before.json after.json --threshold 0.1
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import mini_crafter
+from mini_crafter import collector
+from mini_crafter import recorder
+
+MODES = ('mdp', 'pomdp')
+SIZES = (64, 128, 512)
+
+
+def bench_step(mode, peaceful, size, steps, seed=0):
+  env = mini_crafter.Env(
+      mode=mode, peaceful=peaceful, size=(size, size), seed=seed)
+  return {'steps_per_sec': _steps_per_sec(env, steps, seed)}
+
+
+def bench_reset(mode, peaceful, resets, seed=0):
+  env = mini_crafter.Env(mode=mode, peaceful=peaceful, seed=seed)
+  times, attempts = [], []
+  for _ in range(resets):
+    start = time.perf_counter()
+    _, info = env.reset(return_info=True)
+    times.append(time.perf_counter() - start)
+    attempts.append(info['worldgen']['attempts'])
+  times = 1000 * np.array(times)
+  return {
+      'p50_ms': float(np.percentile(times, 50)),
+      'p99_ms': float(np.percentile(times, 99)),
+      'mean_ms': float(times.mean()),
+      'attempts_mean': float(np.mean(attempts)),
+      'attempts_max': int(np.max(attempts)),
+  }
+
+
+def bench_render(mode, size, renders, seed=0):
+  env = mini_crafter.Env(mode=mode, seed=seed)
+  env.reset()
+  for action in np.random.RandomState(seed).randint(0, 17, 50):
+    env.step(action)
+  out = np.empty(env._frame_shape((size, size)), np.uint8)
+  env.render((size, size), out=out)
+  start = time.perf_counter()
+  for _ in range(renders):
+    env.render((size, size), out=out)
+  return {'render_ms': 1000 * (time.perf_counter() - start) / renders}
+
+
+def bench_recorder(name, steps, seed=0):
+  directory = tempfile.mkdtemp()
+  try:
+    env = mini_crafter.Env(mode='pomdp', seed=seed, length=1000)
+    if name != 'none':
+      env = recorder.Recorder(
+          env, directory, save_stats=True, save_episode=True,
+          save_video=(name == 'video'), save_replay=(name == 'replay'))
+    result = {'steps_per_sec': _steps_per_sec(env, steps, seed)}
+    if name == 'video':
+      result['dropped_frames'] = env.dropped_frames
+    env.close()
+    return result
+  finally:
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def bench_vector(num_envs, workers, steps, seed=0):
+  with collector.Collector(
+      num_envs, 64, workers=workers, seed=seed, mode='pomdp') as vector:
+    vector.reset()
+    actions = np.random.RandomState(seed).randint(0, 17, (steps, num_envs))
+    start = time.perf_counter()
+    for action in actions:
+      vector.step(action)
+    duration = time.perf_counter() - start
+  return {'steps_per_sec': steps * num_envs / duration}
+
+
+def run(quick=False):
+  scale = 0.1 if quick else 1.0
+  steps = max(50, int(2000 * scale))
+  results = {}
+  for mode in MODES:
+    for peaceful in (False, True):
+      name = 'peaceful' if peaceful else 'normal'
+      for size in SIZES:
+        results[f'step/{mode}/{name}/{size}'] = bench_step(
+            mode, peaceful, size, steps // (4 if size > 128 else 1))
+      results[f'reset/{mode}/{name}'] = bench_reset(
+          mode, peaceful, max(10, int(200 * scale)))
+  for mode in MODES:
+    for size in SIZES:
+      results[f'render/{mode}/{size}'] = bench_render(
+          mode, size, max(20, int(500 * scale)))
+  for name in ('none', 'stats_episode', 'replay', 'video'):
+    results[f'recorder/{name}'] = bench_recorder(name, steps)
+  cpus = os.cpu_count() or 1
+  for workers in sorted({1, 2, min(4, cpus), cpus}):
+    results[f'vector/8envs/{workers}workers'] = bench_vector(
+        8, workers, max(20, int(300 * scale)))
+  return {
+      'meta': {
+          'time': datetime.datetime.now().isoformat(timespec='seconds'),
+          'python': sys.version.split()[0],
+          'numpy': np.__version__,
+          'platform': platform.platform(),
+          'cpus': cpus,
+          'quick': quick,
+      },
+      'results': results,
+  }
+
+
+def compare(before, after, threshold):
+  """Rows of (benchmark, metric, before, after, change, regressed).
+
+  Metrics missing from `after` have no value and count as regressions;
+  metrics new in `after` have no previous value and never do.
+  """
+  rows = []
+  names = list(before['results']) + [
+      name for name in after['results'] if name not in before['results']]
+  for name in names:
+    old_metrics = before['results'].get(name, {})
+    new_metrics = after['results'].get(name, {})
+    metrics = list(old_metrics) + [
+        metric for metric in new_metrics if metric not in old_metrics]
+    for metric in metrics:
+      old, value = old_metrics.get(metric), new_metrics.get(metric)
+      if value is None:
+        rows.append((name, metric, old, None, None, True))
+        continue
+      if old is None:
+        rows.append((name, metric, None, value, None, False))
+        continue
+      if old:
+        change = (value - old) / abs(old)
+      else:
+        change = 0.0 if value == old else float('inf')
+      if metric.endswith('_per_sec'):
+        regressed = change < -threshold
+      else:
+        regressed = change > threshold
+      rows.append((name, metric, old, value, change, bool(regressed)))
+  return rows
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  commands = parser.add_subparsers(dest='command', required=True)
+  run_parser = commands.add_parser('run')
+  run_parser.add_argument('--out', default='benchmarks.json')
+  run_parser.add_argument('--quick', action='store_true')
+  compare_parser = commands.add_parser('compare')
+  compare_parser.add_argument('before')
+  compare_parser.add_argument('after')
+  compare_parser.add_argument('--threshold', type=float, default=0.1)
+  args = parser.parse_args()
+  if args.command == 'run':
+    result = run(args.quick)
+    with open(args.out, 'w') as f:
+      json.dump(result, f, indent=2)
+    for name, metrics in result['results'].items():
+      values = '  '.join(f'{k} {v:.2f}' for k, v in metrics.items())
+      print(f'{name:32} {values}')
+    return
+  with open(args.before) as f:
+    before = json.load(f)
+  with open(args.after) as f:
+    after = json.load(f)
+  rows = compare(before, after, args.threshold)
+  for name, metric, old, new, change, regressed in rows:
+    if new is None:
+      flag = 'REMOVED'
+    elif old is None:
+      flag = 'NEW'
+    else:
+      flag = 'REGRESSION' if regressed else ''
+    old = '-' if old is None else f'{old:.2f}'
+    new = '-' if new is None else f'{new:.2f}'
+    change = '' if change is None else f'{100 * change:+7.1f}%'
+    print(f'{name:32} {metric:14} {old:>10} {new:>10} {change:>8}  {flag}')
+  if any(row[-1] for row in rows):
+    sys.exit(1)
+
+
+def _steps_per_sec(env, steps, seed):
+  # Resets at episode ends are left out; bench_reset measures them.
+  actions = np.random.RandomState(seed).randint(0, 17, steps)
+  env.reset()
+  elapsed = 0.0
+  for action in actions:
+    start = time.perf_counter()
+    _, _, done, _ = env.step(action)
+    elapsed += time.perf_counter() - start
+    if done:
+      env.reset()
+  return steps / elapsed
+
+
+if __name__ == '__main__':
+  main()
@@ -1,17 +1,33 @@
+import importlib
+
 from .env import Env
-from .recorder import Recorder
 
-try:
+
+def __getattr__(name):
+  # The recorder pulls in its codec, replay and stats modules, so it is
+  # only imported on use.
+  if name in ('Recorder', 'recorder'):
+    module = importlib.import_module('.recorder', __name__)
+    return module if name == 'recorder' else module.Recorder
+  raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def register():
+  """Register the Crafter ids with gym. Runs on import if gym is installed."""
   import gym
   gym.register(
       id='CrafterReward-v1',
-      entry_point='crafter:Env',
+      entry_point='mini_crafter:Env',
       max_episode_steps=10000,
       kwargs={'reward': True})
   gym.register(
       id='CrafterNoReward-v1',
-      entry_point='crafter:Env',
+      entry_point='mini_crafter:Env',
       max_episode_steps=10000,
       kwargs={'reward': False})
+
+
+try:
+  register()
 except ImportError:
   pass
@@ -0,0 +1,152 @@
+"""Keyframe plus tile-delta storage for recorded image and semantic streams.
+
+Consecutive frames differ in only a few view tiles, so each frame is stored
+either as a keyframe or as the ids of the tiles that changed since the
+previous frame together with their wrapping difference to it. Residuals of
+lighting changes are mostly zeros and ones, which deflate far better than
+the raw pixels. A stream with prefix `p` is stored as the arrays
+
+  p.keyframes  (K, *frame)  full frames
+  p.key_steps  (K,)         steps that are keyframes
+  p.counts     (T,)         number of changed tiles per step
+  p.tile_ids   (M,)         flat tile index of every changed tile
+  p.tiles      (M, th, tw, ...) residual of every changed tile
+  p.offset     (1, 2)       position of the frame inside the tile grid
+
+Frame t is decoded from the closest keyframe before it plus at most
+`keyframe_every - 1` deltas.
+"""
+
+import numpy as np
+
+SUFFIXES = ('keyframes', 'key_steps', 'counts', 'tile_ids', 'tiles', 'offset')
+
+
+class DeltaEncoder:
+
+  def __init__(self, tile, offset=(0, 0), keyframe_every=16):
+    self._tile = tuple(int(x) for x in tile)
+    self._offset = tuple(int(x) for x in offset)
+    self._keyframe_every = keyframe_every
+    self._prev = None
+    self._step = 0
+
+  def encode(self, frame):
+    """Returns the rows to append to each array of the stream, by suffix."""
+    frame = np.asarray(frame)
+    padded = _pad(frame, self._tile, self._offset)
+    tiles = _tiles(padded, self._tile)
+    step, self._step = self._step, self._step + 1
+    offset = np.array([self._offset] if step == 0 else [], np.int64)
+    offset = offset.reshape(-1, 2)
+    if self._prev is None or step % self._keyframe_every == 0:
+      self._prev = padded
+      return {
+          'offset': offset,
+          'keyframes': frame[None],
+          'key_steps': np.array([step], np.int64),
+          'counts': np.zeros(1, np.int32),
+          'tile_ids': np.zeros(0, np.int32),
+          'tiles': np.zeros((0,) + tiles.shape[2:], frame.dtype),
+      }
+    changed = (padded != self._prev).reshape(
+        tiles.shape[0], self._tile[0], tiles.shape[1], self._tile[1], -1)
+    ys, xs = np.nonzero(changed.any(axis=(1, 3, 4)))
+    residual = tiles[ys, xs] - _tiles(self._prev, self._tile)[ys, xs]
+    self._prev = padded
+    return {
+        'offset': offset,
+        'keyframes': np.zeros((0,) + frame.shape, frame.dtype),
+        'key_steps': np.zeros(0, np.int64),
+        'counts': np.array([len(ys)], np.int32),
+        'tile_ids': (ys * tiles.shape[1] + xs).astype(np.int32),
+        'tiles': residual,
+    }
+
+
+class DeltaFrames:
+  """Random-access sequence of the frames of one encoded stream."""
+
+  def __init__(self, arrays, prefix):
+    self._keyframes = arrays[f'{prefix}.keyframes']
+    self._key_steps = np.asarray(arrays[f'{prefix}.key_steps'])
+    counts = np.asarray(arrays[f'{prefix}.counts'])
+    self._tile_ids = np.asarray(arrays[f'{prefix}.tile_ids'])
+    self._tiles = arrays[f'{prefix}.tiles']
+    self._starts = np.concatenate([[0], np.cumsum(counts)])
+    self._tile = self._tiles.shape[1:3]
+    offset = (0, 0)
+    if f'{prefix}.offset' in arrays and len(arrays[f'{prefix}.offset']):
+      offset = arrays[f'{prefix}.offset'][0]
+    self._offset = tuple(int(x) for x in offset)
+    self.shape = (len(counts),) + self._keyframes.shape[1:]
+    self.dtype = self._keyframes.dtype
+    self._buffer = None
+    self._current = None
+
+  def __len__(self):
+    return self.shape[0]
+
+  def __getitem__(self, index):
+    if isinstance(index, slice):
+      return np.stack([self[i] for i in range(*index.indices(len(self)))])
+    index = int(index)
+    if index < 0:
+      index += len(self)
+    if not 0 <= index < len(self):
+      raise IndexError(index)
+    key = np.searchsorted(self._key_steps, index, side='right') - 1
+    start = int(self._key_steps[key])
+    if self._current is None or not start <= self._current <= index:
+      self._buffer = _pad(self._keyframes[key], self._tile, self._offset)
+      self._current = start
+    tiles = _tiles(self._buffer, self._tile)
+    for step in range(self._current + 1, index + 1):
+      lo, hi = self._starts[step], self._starts[step + 1]
+      ids = self._tile_ids[lo: hi]
+      tiles[ids // tiles.shape[1], ids % tiles.shape[1]] += self._tiles[lo: hi]
+    self._current = index
+    oy, ox = self._offset
+    h, w = self.shape[1:3]
+    return self._buffer[oy: oy + h, ox: ox + w].copy()
+
+  def __array__(self, dtype=None, copy=None):
+    frames = self[:]
+    return frames if dtype is None else frames.astype(dtype)
+
+
+def decode(arrays):
+  """Dict of plain arrays and DeltaFrames for every encoded stream."""
+  prefixes = {
+      key[:-len('.keyframes')] for key in arrays
+      if key.endswith('.keyframes')}
+  result = {}
+  for key in arrays:
+    prefix, _, suffix = key.rpartition('.')
+    if prefix in prefixes and suffix in SUFFIXES:
+      continue
+    result[key] = arrays[key]
+  for prefix in prefixes:
+    result[prefix] = DeltaFrames(arrays, prefix)
+  return result
+
+
+def load_episode(filename):
+  with np.load(filename) as data:
+    return decode({key: data[key] for key in data.files})
+
+
+def _pad(frame, tile, offset):
+  (th, tw), (oy, ox) = tile, offset
+  h, w = frame.shape[:2]
+  gh, gw = -(-(oy + h) // th), -(-(ox + w) // tw)
+  padded = np.zeros((gh * th, gw * tw) + frame.shape[2:], frame.dtype)
+  padded[oy: oy + h, ox: ox + w] = frame
+  return padded
+
+
+def _tiles(padded, tile):
+  # View of shape (gh, gw, th, tw, ...) into the padded frame.
+  (th, tw), (h, w) = tile, padded.shape[:2]
+  shape = (h // th, th, w // tw, tw) + padded.shape[2:]
+  return padded.reshape(shape).swapaxes(1, 2)
@@ -0,0 +1,216 @@
+"""Rollout collection into a shared-memory ring buffer.
+
+Collector steps `num_envs` environments in worker processes. All of them
+write into one shared-memory block that holds, for every env, the last
+`capacity` steps as the columns
+
+  image   (T, N, *frame)   observation after the step
+  action  (T, N)           action that led to it (-1 after a reset)
+  reward  (T, N)
+  done    (T, N)           the episode ended with this step
+  first   (T, N)           the observation comes from a reset
+
+Workers render observations straight into their slot (Env.step(out=...)),
+so nothing is sent through pipes besides the actions and a short
+acknowledgement. The learner
+reads the ring in place or samples windows from it. close() stops the
+workers and frees the shared memory; a finalizer does the same if the
+collector is garbage collected or the interpreter exits without it.
+"""
+
+import multiprocessing
+import multiprocessing.shared_memory
+import weakref
+
+import numpy as np
+
+from . import env as env_lib
+
+COLUMNS = ('image', 'action', 'reward', 'done', 'first')
+
+
+class Collector:
+
+  def __init__(self, num_envs, capacity, workers=1, seed=None, **kwargs):
+    self._num_envs = num_envs
+    self._capacity = capacity
+    shape = env_lib.frame_shape(
+        kwargs.get('size', (64, 64)), kwargs.get('obs_layout', 'HWC'))
+    self._specs, nbytes = _specs(capacity, num_envs, shape)
+    self._memory = multiprocessing.shared_memory.SharedMemory(
+        create=True, size=nbytes)
+    self.buffers = _views(self._memory, self._specs)
+    self.buffers['action'][:] = -1
+    self._slot = -1
+    self._filled = 0
+    blocks = np.array_split(np.arange(num_envs), min(workers, num_envs))
+    self._workers = []
+    for indices in blocks:
+      seeds = [None if seed is None else seed + int(i) for i in indices]
+      parent, child = multiprocessing.Pipe()
+      process = multiprocessing.Process(
+          target=_worker, daemon=True, args=(
+              child, self._memory.name, self._specs, list(indices), seeds,
+              kwargs))
+      process.start()
+      child.close()
+      self._workers.append((process, parent, indices))
+    self._finalizer = weakref.finalize(
+        self, _shutdown, self._workers, self._memory)
+
+  @property
+  def slot(self):
+    """Index of the ring row written by the last reset or step."""
+    return self._slot
+
+  def __len__(self):
+    """Number of valid rows in the ring."""
+    return self._filled
+
+  def reset(self):
+    """Reset all envs and return a view of their observations."""
+    self._advance()
+    for _, conn, _ in self._workers:
+      conn.send(('reset', self._slot, None))
+    self._wait()
+    return self.buffers['image'][self._slot]
+
+  def step(self, actions):
+    """Step every env with its action and return views of the results.
+
+    Envs whose episode ended in the previous step are reset instead, which
+    is marked in the `first` column.
+    """
+    actions = np.asarray(actions)
+    self._advance()
+    for _, conn, indices in self._workers:
+      conn.send(('step', self._slot, actions[indices]))
+    self._wait()
+    slot = self._slot
+    return (
+        self.buffers['image'][slot], self.buffers['reward'][slot],
+        self.buffers['done'][slot])
+
+  def sample(self, batch, length, rng=None):
+    """Windows of `length` consecutive steps of random envs.
+
+    Returns a dict of arrays with shape (batch, length, ...). Windows may
+    cross episode boundaries; use the `first` column to split them.
+    """
+    if length > self._filled:
+      raise ValueError(f'Only {self._filled} steps collected so far.')
+    rng = rng or np.random
+    envs = rng.randint(0, self._num_envs, batch)
+    # Offsets count back from the newest row, so windows never straddle the
+    # oldest and newest rows of the ring.
+    ends = rng.randint(0, self._filled - length + 1, batch)
+    rows = (self._slot - ends[:, None] - np.arange(length)[::-1]) % (
+        self._capacity)
+    return {
+        key: self.buffers[key][rows, envs[:, None]] for key in COLUMNS}
+
+  def close(self):
+    self.buffers = None
+    self._finalizer()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *args):
+    self.close()
+
+  def _advance(self):
+    self._slot = (self._slot + 1) % self._capacity
+    self._filled = min(self._filled + 1, self._capacity)
+
+  def _wait(self):
+    # Every worker answers every command, so all answers are read before
+    # raising; a leftover one would be taken as the answer to the next.
+    errors = []
+    for _, conn, _ in self._workers:
+      try:
+        message = conn.recv()
+      except EOFError:
+        message = RuntimeError('A collector worker exited unexpectedly.')
+      if isinstance(message, Exception):
+        errors.append(message)
+    if errors:
+      raise errors[0]
+
+
+def _shutdown(workers, memory):
+  for process, conn, _ in workers:
+    try:
+      conn.send(('close', None, None))
+    except (BrokenPipeError, OSError):
+      pass
+    process.join(5)
+    conn.close()
+  workers.clear()
+  try:
+    memory.close()
+  except BufferError:
+    pass  # Views handed out earlier keep the mapping alive.
+  memory.unlink()
+
+
+def _specs(capacity, num_envs, shape):
+  # (key, dtype, shape, byte offset) of every column in the shared block,
+  # and the size of the block.
+  columns = [
+      ('image', np.uint8, (capacity, num_envs) + tuple(shape)),
+      ('action', np.int64, (capacity, num_envs)),
+      ('reward', np.float32, (capacity, num_envs)),
+      ('done', np.bool_, (capacity, num_envs)),
+      ('first', np.bool_, (capacity, num_envs)),
+  ]
+  specs, offset = [], 0
+  for key, dtype, shape in columns:
+    specs.append((key, np.dtype(dtype).str, shape, offset))
+    offset += np.dtype(dtype).itemsize * int(np.prod(shape))
+    offset += -offset % 64
+  return specs, offset
+
+
+def _views(memory, specs):
+  return {
+      key: np.ndarray(shape, dtype, memory.buf, offset)
+      for key, dtype, shape, offset in specs}
+
+
+def _worker(conn, name, specs, indices, seeds, kwargs):
+  memory = multiprocessing.shared_memory.SharedMemory(name)
+  buffers = _views(memory, specs)
+  try:
+    try:
+      envs = [env_lib.Env(seed=seed, **kwargs) for seed in seeds]
+    except Exception as e:
+      # Reported as the answer to the first command.
+      conn.send(e)
+      return
+    done = [True] * len(envs)
+    while True:
+      command, slot, actions = conn.recv()
+      if command == 'close':
+        break
+      try:
+        for j, (index, env) in enumerate(zip(indices, envs)):
+          if command == 'reset' or done[j]:
+            env.reset(out=buffers['image'][slot, index])
+            buffers['action'][slot, index] = -1
+            buffers['reward'][slot, index] = 0.0
+            buffers['first'][slot, index] = True
+            done[j] = False
+          else:
+            _, reward, done[j], _ = env.step(
+                int(actions[j]), out=buffers['image'][slot, index])
+            buffers['action'][slot, index] = actions[j]
+            buffers['reward'][slot, index] = reward
+            buffers['first'][slot, index] = False
+          buffers['done'][slot, index] = done[j]
+        conn.send(None)
+      except Exception as e:
+        conn.send(e)
+  finally:
+    buffers = None
+    memory.close()
@@ -1,8 +1,33 @@
+import hashlib
+import marshal
 import pathlib
 
-import ruamel.yaml
-
 root = pathlib.Path(__file__).parent
-yaml = ruamel.yaml.YAML(typ='safe', pure=True)
-for key, value in yaml.load((root / 'data.yaml').read_text()).items():
+
+
+def _load(filename):
+  # Parsing YAML in pure Python dominates import time, so the parsed data is
+  # cached next to the bytecode, keyed by the hash of the file.
+  text = filename.read_bytes()
+  digest = hashlib.sha1(text).hexdigest()[:16]
+  cache = root / '__pycache__' / (
+      f'{filename.stem}.{digest}.marshal{marshal.version}')
+  try:
+    return marshal.loads(cache.read_bytes())
+  except (OSError, EOFError, ValueError, TypeError):
+    pass
+  import ruamel.yaml
+  yaml = ruamel.yaml.YAML(typ='safe', pure=True)
+  data = yaml.load(text.decode())
+  try:
+    cache.parent.mkdir(exist_ok=True)
+    tmp = cache.with_suffix(f'.tmp{id(data)}')
+    tmp.write_bytes(marshal.dumps(data))
+    tmp.replace(cache)
+  except (OSError, ValueError):
+    pass
+  return data
+
+
+for key, value in _load(root / 'data.yaml').items():
   globals()[key] = value
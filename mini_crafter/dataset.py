@@ -0,0 +1,227 @@
+"""Sharded, memory-mapped episode datasets.
+
+A dataset directory holds fixed-capacity shards of uncompressed columns,
+
+  shard-00000/<key>.npy   one preallocated array per column
+  index.json              column specs, shard capacities and episodes
+
+where every episode is a contiguous run of rows inside one shard. Rows past
+the last episode of a shard are never written, so the files stay sparse on
+disk. Dataset maps the shards lazily in every process that reads from it and
+serves fixed-length windows as views into the mapped files, so worker
+processes share the page cache instead of decompressing episodes.
+"""
+
+import json
+import os
+import pathlib
+
+import numpy as np
+
+from . import codec
+
+
+class Writer:
+
+  def __init__(self, directory, shard_size=100000):
+    self._directory = pathlib.Path(directory).expanduser()
+    self._directory.mkdir(exist_ok=True, parents=True)
+    self._shard_size = shard_size
+    index = self._directory / 'index.json'
+    if index.exists():
+      self._index = json.loads(index.read_text())
+    else:
+      self._index = {'columns': None, 'shards': [], 'episodes': []}
+    self._arrays = None
+    self._used = 0
+
+  def add(self, episode, name=''):
+    """Append an episode given as a dict of equal-length columns, or as the
+    filename of an .npz written by recorder.EpisodeRecorder."""
+    if not isinstance(episode, dict):
+      name = name or pathlib.Path(episode).stem
+      episode = codec.load_episode(episode)
+    episode = {key: np.asarray(value) for key, value in episode.items()}
+    columns = self._columns(episode)
+    length = len(next(iter(episode.values())))
+    for key, value in episode.items():
+      if len(value) != length:
+        raise ValueError(
+            f'Column {key} has {len(value)} rows, expected {length}.')
+    if self._arrays is None or self._used + length > len(
+        next(iter(self._arrays.values()))):
+      self._open_shard(columns, max(self._shard_size, length))
+    start = self._used
+    for key, array in self._arrays.items():
+      array[start: start + length] = episode[key]
+    self._used += length
+    shard = len(self._index['shards']) - 1
+    self._index['episodes'].append([shard, start, length, name])
+
+  def close(self):
+    if self._arrays is not None:
+      for array in self._arrays.values():
+        array.flush()
+      self._arrays = None
+    self._save_index()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *args):
+    self.close()
+
+  def _columns(self, episode):
+    columns = {
+        key: [value.dtype.str, list(value.shape[1:])]
+        for key, value in episode.items()}
+    if self._index['columns'] is None:
+      self._index['columns'] = columns
+    elif columns != self._index['columns']:
+      raise ValueError('Episode columns differ from the dataset columns.')
+    return columns
+
+  def _open_shard(self, columns, capacity):
+    self.close()
+    shard = len(self._index['shards'])
+    folder = self._directory / f'shard-{shard:05d}'
+    # A folder that the index does not list yet was left behind by a writer
+    # that crashed before close(). Its rows were never published, so it is
+    # overwritten.
+    folder.mkdir(exist_ok=True)
+    for stale in folder.glob('*.npy'):
+      stale.unlink()
+    self._arrays = {
+        key: np.lib.format.open_memmap(
+            folder / f'{key}.npy', 'w+', np.dtype(dtype),
+            (capacity,) + tuple(shape))
+        for key, (dtype, shape) in columns.items()}
+    self._index['shards'].append(capacity)
+    self._used = 0
+
+  def _save_index(self):
+    # Written after the shard data so readers never see unflushed rows.
+    tmp = self._directory / 'index.json.tmp'
+    tmp.write_text(json.dumps(self._index))
+    os.replace(tmp, self._directory / 'index.json')
+
+
+def convert(filenames, directory, shard_size=100000):
+  """Write recorded .npz episodes into a sharded dataset."""
+  with Writer(directory, shard_size) as writer:
+    for filename in sorted(filenames):
+      writer.add(filename)
+
+
+class Dataset:
+  """Random access to windows of `length` consecutive rows of an episode.
+
+  Window i is a dict of read-only views into the mapped shards. Instances
+  pickle as their directory and arguments, so they can be handed to worker
+  processes, which map the shards again on first access.
+  """
+
+  def __init__(self, directory, length, keys=None):
+    self._directory = pathlib.Path(directory).expanduser()
+    self._length = length
+    index = json.loads((self._directory / 'index.json').read_text())
+    self._keys = tuple(keys or index['columns'] or ())
+    episodes = np.array(
+        [episode[:3] for episode in index['episodes']], np.int64)
+    episodes = episodes.reshape(-1, 3)
+    episodes = episodes[episodes[:, 2] >= length]
+    self._episodes = episodes
+    self._names = [
+        episode[3] for episode in index['episodes'] if episode[2] >= length]
+    counts = episodes[:, 2] - length + 1
+    self._offsets = np.concatenate([[0], np.cumsum(counts)])
+    self._shards = None
+    self._pid = None
+    self._rng = None
+
+  def __len__(self):
+    return int(self._offsets[-1])
+
+  @property
+  def keys(self):
+    return self._keys
+
+  @property
+  def episodes(self):
+    return len(self._episodes)
+
+  @property
+  def names(self):
+    return self._names
+
+  def __getitem__(self, index):
+    if not -len(self) <= index < len(self):
+      raise IndexError(index)
+    index %= len(self)
+    episode = np.searchsorted(self._offsets, index, side='right') - 1
+    shard, start, _ = self._episodes[episode]
+    start += index - self._offsets[episode]
+    arrays = self._mapped(int(shard))
+    return {
+        key: arrays[key][start: start + self._length] for key in self._keys}
+
+  def episode(self, index):
+    """Views of all rows of the index-th episode that fits a window."""
+    shard, start, length = self._episodes[index]
+    arrays = self._mapped(int(shard))
+    return {key: arrays[key][start: start + length] for key in self._keys}
+
+  def sample(self, batch, rng=None):
+    """Batch of uniformly sampled windows with shape (batch, length, ...).
+
+    Unlike indexing, this gathers the windows into new arrays, so the
+    batch is a copy that is safe to modify or send to another process.
+    """
+    if rng is None:
+      self._check_process()
+      rng = self._rng
+    if not len(self):
+      raise ValueError(f'No episode has at least {self._length} rows.')
+    indices = np.sort(rng.randint(0, len(self), batch))
+    episode = np.searchsorted(self._offsets, indices, side='right') - 1
+    starts = self._episodes[episode, 1] + indices - self._offsets[episode]
+    shards = self._episodes[episode, 0]
+    window = np.arange(self._length)
+    result = {}
+    for key in self._keys:
+      first = self._mapped(int(shards[0]))[key]
+      out = np.empty((batch, self._length) + first.shape[1:], first.dtype)
+      for shard in np.unique(shards):
+        mask = shards == shard
+        rows = starts[mask][:, None] + window
+        out[mask] = self._mapped(int(shard))[key][rows]
+      result[key] = out
+    return result
+
+  def iterate(self, batch, seed=None):
+    rng = np.random.RandomState(seed)
+    while True:
+      yield self.sample(batch, rng)
+
+  def __getstate__(self):
+    state = self.__dict__.copy()
+    state['_shards'] = None
+    state['_pid'] = None
+    state['_rng'] = None
+    return state
+
+  def _check_process(self):
+    # Forked workers must neither share file handles nor random streams.
+    if self._pid != os.getpid():
+      self._shards = {}
+      self._pid = os.getpid()
+      self._rng = np.random.RandomState()
+
+  def _mapped(self, shard):
+    self._check_process()
+    if shard not in self._shards:
+      folder = self._directory / f'shard-{shard:05d}'
+      self._shards[shard] = {
+          key: np.load(folder / f'{key}.npy', mmap_mode='r')
+          for key in self._keys}
+    return self._shards[shard]
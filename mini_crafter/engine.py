@@ -1,11 +1,16 @@
 import collections
 import functools
+import hashlib
+import json
 import pathlib
+import time
+import zlib
 
-import imageio.v3 as imageio
 import numpy as np
 from PIL import Image, ImageEnhance
 
+from . import events
+
 
 class AttrDict(dict):
 
@@ -21,6 +26,105 @@ class staticproperty:
     return self.function()
 
 
+class LRUCache:
+  """Least-recently-used mapping bounded by the total size of its values.
+
+  Callers pass the size in bytes of each value on insertion. Entries larger
+  than the whole budget are not stored. A single instance can be shared by
+  all environments of a process. The optional `on_evict` callback receives
+  the key of every entry dropped to stay within budget.
+  """
+
+  def __init__(self, max_bytes, on_evict=None):
+    self.max_bytes = int(max_bytes)
+    self.on_evict = on_evict
+    self._entries = collections.OrderedDict()
+    self.bytes = 0
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+
+  def __len__(self):
+    return len(self._entries)
+
+  def __contains__(self, key):
+    return key in self._entries
+
+  def get(self, key, default=None):
+    entry = self._entries.get(key)
+    if entry is None:
+      self.misses += 1
+      return default
+    self.hits += 1
+    self._entries.move_to_end(key)
+    return entry[0]
+
+  def put(self, key, value, nbytes):
+    if key in self._entries:
+      self.bytes -= self._entries.pop(key)[1]
+    if nbytes > self.max_bytes:
+      return
+    self._entries[key] = (value, nbytes)
+    self.bytes += nbytes
+    self._evict()
+
+  def resize(self, max_bytes):
+    self.max_bytes = int(max_bytes)
+    self._evict()
+
+  def clear(self):
+    keys = list(self._entries) if self.on_evict else ()
+    self._entries.clear()
+    self.bytes = 0
+    for key in keys:
+      self.on_evict(key)
+
+  def stats(self):
+    return {
+        'entries': len(self._entries), 'bytes': self.bytes,
+        'max_bytes': self.max_bytes, 'hits': self.hits,
+        'misses': self.misses, 'evictions': self.evictions}
+
+  def _evict(self):
+    while self.bytes > self.max_bytes:
+      key, (_, size) = self._entries.popitem(last=False)
+      self.bytes -= size
+      self.evictions += 1
+      if self.on_evict:
+        self.on_evict(key)
+
+
+MASK = (1 << 64) - 1
+
+
+def zobrist(name, value):
+  """64-bit Zobrist key of a (name, integer value) pair.
+
+  Keys of different pairs are independent random-looking numbers, so a
+  state hash is the XOR of the keys of its parts and a change to one part
+  is an O(1) update. Keys are the same in every process.
+  """
+  return _mix((_name_key(name) + int(value)) & MASK)
+
+
+@functools.lru_cache(None)
+def _name_key(name):
+  return _mix(zlib.crc32(name.encode()))
+
+
+def _mix(z):
+  # Finalizer of splitmix64.
+  z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9 & MASK
+  z = (z ^ (z >> 27)) * 0x94D049BB133111EB & MASK
+  return z ^ (z >> 31)
+
+
+def _mix_array(z):
+  z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+  z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+  return z ^ (z >> np.uint64(31))
+
+
 class World:
 
   def __init__(self, area, materials, chunk_size):
@@ -28,15 +132,50 @@ class World:
     self._chunk_size = chunk_size
     self._mat_names = {i: x for i, x in enumerate([None] + materials)}
     self._mat_ids = {x: i for i, x in enumerate([None] + materials)}
+    # Zobrist keys of the cells. A cell holding material or object `name`
+    # contributes zobrist(name, key) to the hash, empty cells nothing.
+    self._cell_keys = np.random.RandomState(0).randint(
+        0, 2 ** 63, area, np.int64).astype(np.uint64)
     self.reset()
 
   def reset(self, seed=None):
     self.random = np.random.RandomState(seed)
+    # Night noise is seeded separately and never drawn from `random`, so
+    # that rendering cannot change the simulation. The seed is derived
+    # rather than reused, so the two streams are independent.
+    self.render_seed = int(np.random.SeedSequence(seed).generate_state(1)[0])
     self.daylight = 0.0
-    self._chunks = collections.defaultdict(set)
+    # Chunk members are kept in insertion-ordered dicts rather than sets so
+    # that iterating a chunk is deterministic across processes.
+    self._chunks = collections.defaultdict(dict)
     self._objects = [None]
     self._mat_map = np.zeros(self.area, np.uint8)
     self._obj_map = np.zeros(self.area, np.uint32)
+    # Events since the env last started a step, see events.py. None turns
+    # recording off, which Env.reset() does during world generation.
+    self.events = []
+    # None until the hash is first requested, so that world generation does
+    # not pay for incremental updates.
+    self._hash = None
+
+  @property
+  def hash(self):
+    """64-bit Zobrist hash of the materials and object types by cell.
+
+    Computed in full on first access after a reset or state restore and
+    then updated in O(1) by every change made through the World methods.
+    """
+    if self._hash is None:
+      ids = np.arange(len(self._mat_names))
+      names = np.array(
+          [0] + [_name_key(self._mat_names[i]) for i in ids[1:]], np.uint64)
+      keys = _mix_array(names[self._mat_map] + self._cell_keys)
+      keys[self._mat_map == 0] = 0
+      value = int(np.bitwise_xor.reduce(keys, axis=None))
+      for obj in self.objects:
+        value ^= self._object_key(obj, obj.pos)
+      self._hash = value
+    return self._hash
 
   @property
   def objects(self):
@@ -53,15 +192,25 @@ class World:
     index = len(self._objects)
     self._objects.append(obj)
     self._obj_map[tuple(obj.pos)] = index
-    self._chunks[self.chunk_key(obj.pos)].add(obj)
+    self._chunks[self.chunk_key(obj.pos)][obj] = None
+    if self._hash is not None:
+      self._hash ^= self._object_key(obj, obj.pos)
+    if self.events is not None:
+      self.events.append(
+          events.ObjectAdded(tuple(obj.pos.tolist()), type(obj).__name__))
 
   def remove(self, obj):
     if obj.removed:
       return
     self._objects[self._obj_map[tuple(obj.pos)]] = None
     self._obj_map[tuple(obj.pos)] = 0
-    self._chunks[self.chunk_key(obj.pos)].remove(obj)
+    del self._chunks[self.chunk_key(obj.pos)][obj]
     obj.removed = True
+    if self._hash is not None:
+      self._hash ^= self._object_key(obj, obj.pos)
+    if self.events is not None:
+      self.events.append(
+          events.ObjectRemoved(tuple(obj.pos.tolist()), type(obj).__name__))
 
   def move(self, obj, pos):
     if obj.removed:
@@ -74,15 +223,28 @@ class World:
     old_chunk = self.chunk_key(obj.pos)
     new_chunk = self.chunk_key(pos)
     if old_chunk != new_chunk:
-      self._chunks[old_chunk].remove(obj)
-      self._chunks[new_chunk].add(obj)
+      del self._chunks[old_chunk][obj]
+      self._chunks[new_chunk][obj] = None
+    if self._hash is not None:
+      self._hash ^= (
+          self._object_key(obj, obj.pos) ^ self._object_key(obj, pos))
     obj.pos = pos
 
   def __setitem__(self, pos, material):
     if material not in self._mat_ids:
       id_ = len(self._mat_ids)
       self._mat_ids[material] = id_
-    self._mat_map[tuple(pos)] = self._mat_ids[material]
+      self._mat_names[id_] = material
+    pos = tuple(int(x) for x in pos)
+    old = self._mat_names[self._mat_map[pos]]
+    if self._hash is not None:
+      key = int(self._cell_keys[pos])
+      if old is not None:
+        self._hash ^= zobrist(old, key)
+      self._hash ^= zobrist(material, key)
+    self._mat_map[pos] = self._mat_ids[material]
+    if self.events is not None:
+      self.events.append(events.MaterialChanged(pos, old, material))
 
   def __getitem__(self, pos):
     if not _inside((0, 0), pos, self.area):
@@ -101,6 +263,34 @@ class World:
     objs = {self._objects[i] for i in indices if i > 0}
     return materials, objs
 
+  def objects_within(self, pos, distance):
+    """Objects inside the square of the given radius, in insertion order."""
+    (x, y), d = pos, distance
+    indices = np.unique(self._obj_map[
+        max(0, x - d): x + d + 1, max(0, y - d): y + d + 1])
+    return [self._objects[i] for i in indices.tolist() if i > 0]
+
+  def chunks_within(self, pos, distance):
+    """(chunk, objects) pairs for every chunk overlapping the square of the
+    given radius, including chunks that hold no objects yet."""
+    (x, y), d, (csx, csy) = pos, distance, self._chunk_size
+    xmin, ymin = max(0, x - d), max(0, y - d)
+    xmax, ymax = min(self.area[0], x + d + 1), min(self.area[1], y + d + 1)
+    pairs = []
+    for cx in range((xmin // csx) * csx, xmax, csx):
+      for cy in range((ymin // csy) * csy, ymax, csy):
+        key = self.chunk_key((cx, cy))
+        pairs.append((key, self._chunks.get(key, {})))
+    return pairs
+
+  def paint(self, mask, material):
+    if material not in self._mat_ids:
+      id_ = len(self._mat_ids)
+      self._mat_ids[material] = id_
+      self._mat_names[id_] = material
+    self._hash = None
+    self._mat_map[mask] = self._mat_ids[material]
+
   def mask(self, xmin, xmax, ymin, ymax, material):
     region = self._mat_map[xmin: xmax, ymin: ymax]
     return (region == self._mat_ids[material])
@@ -108,6 +298,9 @@ class World:
   def count(self, material):
     return (self._mat_map == self._mat_ids[material]).sum()
 
+  def _object_key(self, obj, pos):
+    return zobrist(type(obj).__name__, int(self._cell_keys[tuple(pos)]))
+
   def chunk_key(self, pos):
     (x, y), (csx, csy) = pos, self._chunk_size
     xmin, ymin = (x // csx) * csx, (y // csy) * csy
@@ -118,27 +311,120 @@ class World:
 
 class Textures:
 
-  def __init__(self, directory):
-    self._originals = {}
-    self._textures = {}
-    for filename in pathlib.Path(directory).glob('*.png'):
-      image = imageio.imread(filename.read_bytes())
-      image = image.transpose((1, 0) + tuple(range(2, len(image.shape))))
-      self._originals[filename.stem] = image
-      self._textures[(filename.stem, image.shape[:2])] = image
+  # Originals come from the atlas bundle in the asset directory (see
+  # build_atlas), memory-mapped read-only so that forked workers share its
+  # pages, and are decoded from the PNG files only when the bundle is
+  # missing or stale. Resized textures live in an LRUCache of `max_bytes`;
+  # Textures.shared() returns one instance per process, directory and budget,
+  # so envs asking for different budgets get separate caches.
+
+  _shared = {}
+
+  @classmethod
+  def shared(cls, directory, max_bytes=None):
+    max_bytes = int(max_bytes or 16 << 20)
+    key = str(pathlib.Path(directory).resolve()), max_bytes
+    if key not in cls._shared:
+      cls._shared[key] = cls(directory, max_bytes)
+    return cls._shared[key]
+
+  def __init__(self, directory, max_bytes=16 << 20):
+    directory = pathlib.Path(directory)
+    self._originals = _load_atlas(directory)
+    if self._originals is None:
+      self._originals = {
+          filename.stem: _read_texture(filename)
+          for filename in directory.glob('*.png')}
+    self.cache = LRUCache(max_bytes, self._evicted)
+    # Sizes and name tuples that prewarm() has fully resized; a size is
+    # dropped again once any of its textures is evicted.
+    self._warm = set()
 
   def get(self, name, size):
     if name is None:
       name = 'unknown'
     size = int(size[0]), int(size[1])
+    image = self._originals[name]
+    if size == image.shape[:2]:
+      return image
     key = name, size
-    if key not in self._textures:
-      image = self._originals[name]
-      image = Image.fromarray(image)
-      image = image.resize(size[::-1], resample=Image.NEAREST)
-      image = np.array(image)
-      self._textures[key] = image
-    return self._textures[key]
+    texture = self.cache.get(key)
+    if texture is None:
+      texture = Image.fromarray(np.asarray(image))
+      texture = texture.resize(size[::-1], resample=Image.NEAREST)
+      texture = np.array(texture)
+      self.cache.put(key, texture, texture.nbytes)
+    return texture
+
+  def prewarm(self, sizes, names=None):
+    """Resize the named textures (default: all) to each of the sizes."""
+    names = tuple(names or self._originals)
+    for size in sizes:
+      key = (int(size[0]), int(size[1])), names
+      if key in self._warm:
+        continue
+      # Marked first, so that evictions by this very loop unmark it again
+      # when the budget cannot hold all of the names.
+      self._warm.add(key)
+      for name in names:
+        self.get(name, size)
+
+  def stats(self):
+    return self.cache.stats()
+
+  def _evicted(self, key):
+    size = key[1]
+    self._warm = {warm for warm in self._warm if warm[0] != size}
+
+
+def build_atlas(directory):
+  """Decode the PNG textures of a directory into atlas.npy and atlas.json.
+
+  The atlas is one flat uint8 array of all textures in (x, y) order, and
+  the index maps each name to its offset and shape. The index also stores
+  a hash of the PNG files, and an atlas whose hash no longer matches is
+  ignored in favour of the PNG files until it is rebuilt.
+  """
+  directory = pathlib.Path(directory)
+  index, parts, offset = {}, [], 0
+  for filename in sorted(directory.glob('*.png')):
+    image = np.ascontiguousarray(_read_texture(filename))
+    index[filename.stem] = [offset, list(image.shape)]
+    parts.append(image.ravel())
+    offset += image.size
+  np.save(directory / 'atlas.npy', np.concatenate(parts))
+  (directory / 'atlas.json').write_text(json.dumps(
+      {'sha1': _png_digest(directory), 'textures': index}, sort_keys=True))
+
+
+def _load_atlas(directory):
+  try:
+    meta = json.loads((directory / 'atlas.json').read_text())
+    atlas = np.load(directory / 'atlas.npy', mmap_mode='r')
+  except (OSError, ValueError):
+    return None
+  # Reading the PNG bytes is cheap next to decoding them, and catches files
+  # that were added, removed or edited since the atlas was built.
+  if meta.get('sha1') != _png_digest(directory):
+    return None
+  index = meta['textures']
+  return {
+      name: atlas[offset: offset + int(np.prod(shape))].reshape(shape)
+      for name, (offset, shape) in index.items()}
+
+
+def _png_digest(directory):
+  digest = hashlib.sha1()
+  for filename in sorted(directory.glob('*.png')):
+    digest.update(filename.name.encode() + b'\0')
+    digest.update(filename.read_bytes())
+  return digest.hexdigest()
+
+
+def _read_texture(filename):
+  import imageio.v3 as imageio
+  image = imageio.imread(filename.read_bytes())
+  return image.transpose((1, 0) + tuple(range(2, len(image.shape))))
 
 
 class GlobalView:
@@ -153,6 +439,9 @@ class UncoverView:
 
 class StaticLocalView:
 
+  # Set by Env(profile=True) to time drawing and lighting.
+  profiler = None
+
   def __init__(self, world, textures, grid):
     self._world = world
     self._textures = textures
@@ -161,32 +450,32 @@ class StaticLocalView:
     self._static_center = self._area // 2
     self._offset = self._grid // 2
 
-  def __call__(self, player, unit):
+  def __call__(self, player, unit, random=None):
+    return self.draw(self.scene(player), unit, random)
+
+  def scene(self, player):
+    """What to draw, independent of the resolution it is drawn at."""
+    return _scene(
+        self._world, self._static_center, self._grid, self._offset,
+        self._area, player)
+
+  def scene_key(self, player):
+    """Equal for equal scenes, without building the scene."""
+    return _scene_key(
+        self._world, self._static_center, self._grid, self._offset,
+        self._area)
+
+  def draw(self, scene, unit, random=None):
+    # The night noise is drawn from `random`, which defaults to a fixed
+    # pattern of the world's render seed.
     self._unit = np.array(unit)
-    center = self._static_center
-    canvas = np.zeros(tuple(self._grid * unit) + (3,), np.uint8) + 127
-    for x in range(self._grid[0]):
-      for y in range(self._grid[1]):
-        pos = center + np.array([x, y]) - self._offset
-        if not _inside((0, 0), pos, self._area):
-          continue
-        texture = self._textures.get(self._world[pos][0], unit)
-        _draw(canvas, np.array([x, y]) * unit, texture)
-    for obj in self._world.objects:
-      pos = obj.pos - center + self._offset
-      if not _inside((0, 0), pos, self._grid):
-        continue
-      texture = self._textures.get(obj.texture, unit)
-      _draw_alpha(canvas, pos * unit, texture)
-    canvas = self._light(canvas, self._world.daylight)
-    if player.sleeping:
-      canvas = self._sleep(canvas)
-    return canvas
+    random = random or np.random.default_rng(self._world.render_seed)
+    return _draw_scene(self, scene, self._grid, unit, random)
 
-  def _light(self, canvas, daylight):
+  def _light(self, canvas, daylight, random):
     night = canvas
     if daylight < 0.5:
-      night = self._noise(night, 2 * (0.5 - daylight), 0.5)
+      night = self._noise(night, 2 * (0.5 - daylight), 0.5, random)
     night = np.array(ImageEnhance.Color(
         Image.fromarray(night.astype(np.uint8))).enhance(0.4))
     night = self._tint(night, (0, 16, 64), 0.5)
@@ -202,8 +491,8 @@ class StaticLocalView:
     color = np.array(color)
     return (1 - amount) * canvas + amount * color
 
-  def _noise(self, canvas, amount, stddev):
-    noise = self._world.random.uniform(32, 127, canvas.shape[:2])[..., None]
+  def _noise(self, canvas, amount, stddev, random):
+    noise = random.uniform(32, 127, canvas.shape[:2])[..., None]
     mask = amount * self._vignette(canvas.shape, stddev)[..., None]
     return (1 - mask) * canvas + mask * noise
 
@@ -217,6 +506,9 @@ class StaticLocalView:
 
 class LocalView:
 
+  # Set by Env(profile=True) to time drawing and lighting.
+  profiler = None
+
   def __init__(self, world, textures, grid):
     self._world = world
     self._textures = textures
@@ -225,34 +517,36 @@ class LocalView:
     self._area = np.array(self._world.area)
     self._center = None
 
-  def __call__(self, player, unit):
-    self._unit = np.array(unit)
+  def __call__(self, player, unit, random=None):
+    return self.draw(self.scene(player), unit, random)
+
+  def scene(self, player):
+    """What to draw, independent of the resolution it is drawn at."""
     self._center = np.array(player.pos)
-    canvas = np.zeros(tuple(self._grid * unit) + (3,), np.uint8) + 127
-    for x in range(self._grid[0]):
-      for y in range(self._grid[1]):
-        pos = self._center + np.array([x, y]) - self._offset
-        if not _inside((0, 0), pos, self._area):
-          continue
-        texture = self._textures.get(self._world[pos][0], unit)
-        _draw(canvas, np.array([x, y]) * unit, texture)
-    for obj in self._world.objects:
-      pos = obj.pos - self._center + self._offset
-      if not _inside((0, 0), pos, self._grid):
-        continue
-      texture = self._textures.get(obj.texture, unit)
-      _draw_alpha(canvas, pos * unit, texture)
-    canvas = self._light(canvas, self._world.daylight)
-    if player.sleeping:
-      canvas = self._sleep(canvas)
+    return _scene(
+        self._world, self._center, self._grid, self._offset, self._area,
+        player)
+
+  def scene_key(self, player):
+    """Equal for equal scenes, without building the scene."""
+    return _scene_key(
+        self._world, np.array(player.pos), self._grid, self._offset,
+        self._area)
+
+  def draw(self, scene, unit, random=None):
+    # The night noise is drawn from `random`, which defaults to a fixed
+    # pattern of the world's render seed.
+    self._unit = np.array(unit)
+    random = random or np.random.default_rng(self._world.render_seed)
+    canvas = _draw_scene(self, scene, self._grid, unit, random)
     # if player.health < 1:
     #   canvas = self._tint(canvas, (128, 0, 0), 0.6)
     return canvas
 
-  def _light(self, canvas, daylight):
+  def _light(self, canvas, daylight, random):
     night = canvas
     if daylight < 0.5:
-      night = self._noise(night, 2 * (0.5 - daylight), 0.5)
+      night = self._noise(night, 2 * (0.5 - daylight), 0.5, random)
     night = np.array(ImageEnhance.Color(
         Image.fromarray(night.astype(np.uint8))).enhance(0.4))
     night = self._tint(night, (0, 16, 64), 0.5)
@@ -268,8 +562,8 @@ class LocalView:
     color = np.array(color)
     return (1 - amount) * canvas + amount * color
 
-  def _noise(self, canvas, amount, stddev):
-    noise = self._world.random.uniform(32, 127, canvas.shape[:2])[..., None]
+  def _noise(self, canvas, amount, stddev, random):
+    noise = random.uniform(32, 127, canvas.shape[:2])[..., None]
     mask = amount * self._vignette(canvas.shape, stddev)[..., None]
     return (1 - mask) * canvas + mask * noise
 
@@ -287,6 +581,12 @@ class ItemView:
     self._textures = textures
     self._grid = np.array(grid)
 
+  @staticmethod
+  def texture_sizes(unit):
+    """Sizes of the item and amount textures drawn for a view unit."""
+    unit = np.array(unit)
+    return [0.8 * unit, 0.6 * unit]
+
   def __call__(self, inventory, unit):
     unit = np.array(unit)
     canvas = np.zeros(tuple(self._grid * unit) + (3,), np.uint8)
@@ -319,14 +619,84 @@ class SemanticView:
     self._obj_ids = {
         c: len(self._mat_ids) + i
         for i, c in enumerate(obj_types)}
+    # Semantic id per object index. Indices are never reused within an
+    # episode, so the table only grows until the world is reset.
+    self._objects = None
+    self._codes = np.zeros(0, np.uint8)
 
   def __call__(self):
+    objs = self._world._objects
+    if objs is not self._objects or len(objs) < len(self._codes):
+      self._objects = objs
+      self._codes = np.zeros(0, np.uint8)
+    if len(self._codes) < len(objs):
+      new = [
+          self._obj_ids[type(obj)] if obj else 0
+          for obj in objs[len(self._codes):]]
+      self._codes = np.concatenate([self._codes, np.array(new, np.uint8)])
     canvas = self._world._mat_map.copy()
-    for obj in self._world.objects:
-      canvas[tuple(obj.pos)] = self._obj_ids[type(obj)]
+    indices = self._world._obj_map
+    mask = indices > 0
+    canvas[mask] = self._codes[indices[mask]]
     return canvas
 
 
+def _scene(world, center, grid, offset, area, player):
+  # Material names of the visible cells and the sprites on top of them,
+  # both in grid coordinates, plus the global effects.
+  cells = []
+  for x in range(grid[0]):
+    for y in range(grid[1]):
+      pos = center + np.array([x, y]) - offset
+      if not _inside((0, 0), pos, area):
+        continue
+      cells.append(((x, y), world[pos][0]))
+  sprites = _sprites(world, center, grid, offset)
+  return cells, sprites, world.daylight, player.sleeping
+
+
+def _scene_key(world, center, grid, offset, area):
+  # The clipped window of the material map and the sprites in it determine
+  # the cells and sprites of _scene() without looking up every cell.
+  low = np.maximum(center - offset, 0)
+  high = np.minimum(center - offset + grid, area)
+  window = world._mat_map[low[0]: high[0], low[1]: high[1]]
+  return (
+      tuple((low - center).tolist()), window.shape, window.tobytes(),
+      tuple(_sprites(world, center, grid, offset)))
+
+
+def _sprites(world, center, grid, offset):
+  sprites = []
+  for obj in world.objects_within(center, int(grid.max())):
+    pos = obj.pos - center + offset
+    if not _inside((0, 0), pos, grid):
+      continue
+    sprites.append((tuple(pos), obj.texture))
+  return sprites
+
+
+def _draw_scene(view, scene, grid, unit, random):
+  prof = view.profiler
+  if prof:
+    start = time.perf_counter()
+  cells, sprites, daylight, sleeping = scene
+  textures = view._textures
+  canvas = np.zeros(tuple(grid * unit) + (3,), np.uint8) + 127
+  for pos, name in cells:
+    _draw(canvas, np.array(pos) * unit, textures.get(name, unit))
+  for pos, name in sprites:
+    _draw_alpha(canvas, np.array(pos) * unit, textures.get(name, unit))
+  if prof:
+    start = prof.lap('terrain', start)
+  canvas = view._light(canvas, daylight, random)
+  if sleeping:
+    canvas = view._sleep(canvas)
+  if prof:
+    prof.lap('lighting', start)
+  return canvas
+
+
 def _inside(lhs, mid, rhs):
   return (lhs[0] <= mid[0] < rhs[0]) and (lhs[1] <= mid[1] < rhs[1])
 
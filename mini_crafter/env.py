@@ -1,10 +1,16 @@
 import collections
 import importlib
+import time
+import zlib
+
 import numpy as np
 
 from . import constants
 from . import engine
+from . import events as events_lib
 from . import objects
+from . import profiler
+from . import state as state_lib
 
 try:
   import gym
@@ -21,14 +27,34 @@ except ImportError:
 
 class Env(BaseClass):
 
+  # The parts of the gym.Env interface that wrappers rely on, for when gym
+  # is not installed.
+  spec = None
+  render_mode = None
+
   def __init__(
       self, area=(64, 64), view=(9, 9), size=(64, 64),
       reward=True, length=10000, seed=None,
       mode='mdp', peaceful=False, reward_scale=None,
-      worldgen_module='mini_crafter.worldgen'):
-    
-    if mode not in ['mdp', 'pomdp']:
-      raise ValueError(f"mode must be 'mdp' or 'pomdp', got {mode}")
+      worldgen_module='mini_crafter.worldgen', layout_cache=None,
+      obs_layout='HWC', texture_cache=None, profile=False, hash_info=False,
+      frame_cache=None, daylight_levels=16, action_repeat=1):
+
+    # Constructor arguments, kept so that recorded episodes can rebuild an
+    # identical environment (see recorder.ReplayRecorder). A frame cache
+    # changes how frames are lit, so it is kept as its byte budget.
+    self._config = dict(
+        area=_listify(area), view=_listify(view), size=_listify(size),
+        reward=reward, length=length, seed=seed, mode=mode,
+        peaceful=peaceful, reward_scale=reward_scale,
+        worldgen_module=worldgen_module, obs_layout=obs_layout,
+        hash_info=hash_info, action_repeat=action_repeat,
+        frame_cache=getattr(frame_cache, 'max_bytes', frame_cache),
+        daylight_levels=daylight_levels)
+    if obs_layout not in ('HWC', 'CHW'):
+      raise ValueError(f"obs_layout must be 'HWC' or 'CHW', got {obs_layout}")
+    if mode not in ['mdp', 'pomdp', 'large']:
+      raise ValueError(f"mode must be 'mdp', 'pomdp' or 'large', got {mode}")
     
     if mode == 'mdp':
       # MDP: 9×7 world, fully observable
@@ -36,17 +62,26 @@ class Env(BaseClass):
       view = (9, 9)  # See entire world (map is 9x7, inventory 9x2)
       if reward_scale is None:
         reward_scale = 0.5
-    else:  # mode == 'pomdp'
+    elif mode == 'pomdp':
       # POMDP: 15×15 world, partially observable with same zoom level
       area = (15, 15)
       view = (9, 9)  # Same zoom level as MDP, but partial view
       if reward_scale is None:
         reward_scale = 0.7
+    else:  # mode == 'large'
+      # Large: configurable area (e.g. 64×64 up to 256×256), partial view.
+      # Only chunks near the player are simulated and balanced.
+      area = tuple(int(x) for x in (
+          area if hasattr(area, '__len__') else (area, area)))
+      view = (9, 9)
+      if reward_scale is None:
+        reward_scale = 1.0
 
     self._mini_mode = mode
     self._mini_peaceful = peaceful
     self._mini_reward_scale = reward_scale
     self._mini_static_camera = (mode == 'mdp')  # Static camera for MDP, following camera for POMDP
+    self._mini_active_chunks = (mode == 'large')  # Balance only chunks near the player
     
     try:
         self._worldgen = importlib.import_module(worldgen_module)
@@ -56,15 +91,39 @@ class Env(BaseClass):
     view = np.array(view if hasattr(view, '__len__') else (view, view))
     size = np.array(size if hasattr(size, '__len__') else (size, size))
     seed = np.random.randint(0, 2**31 - 1) if seed is None else seed
+    self._config['seed'] = int(seed)
     self._area = area
     self._view = view
     self._size = size
+    # Observations are channel-last images or channel-first arrays for
+    # frameworks that expect them, both C-contiguous.
+    self._obs_layout = obs_layout
     self._reward = reward
     self._length = length
+    self._hash_info = hash_info
+    # Every step() applies its action this many times and renders once.
+    self._action_repeat = action_repeat
     self._seed = seed
     self._episode = 0
+    self._update_dist = 2 * max(view)
+    # Finished layouts keyed by world seed. Pass an engine.LRUCache to share
+    # one cache between the envs of a process, or a byte budget for a
+    # private one.
+    if isinstance(layout_cache, (int, float)):
+      layout_cache = engine.LRUCache(layout_cache) if layout_cache else None
+    self._layout_cache = layout_cache
+    # Rendered frames keyed by the visible scene, for views that are seen
+    # again. Takes an engine.LRUCache or a byte budget like layout_cache.
+    if isinstance(frame_cache, (int, float)):
+      frame_cache = engine.LRUCache(frame_cache) if frame_cache else None
+    self._frame_cache = frame_cache
+    self._daylight_levels = daylight_levels
+    self._frame_key = (mode, tuple(area), tuple(view), obs_layout)
     self._world = engine.World(area, constants.materials, (12, 12))
-    self._textures = engine.Textures(constants.root / 'assets')
+    # Resized textures are shared by all envs of the process that use the
+    # same budget, in an LRU cache of `texture_cache` bytes (default 16 MiB).
+    self._textures = engine.Textures.shared(
+        constants.root / 'assets', texture_cache)
     item_rows = int(np.ceil(len(constants.items) / view[0]))
     
     if self._mini_static_camera:
@@ -79,21 +138,32 @@ class Env(BaseClass):
     self._sem_view = engine.SemanticView(self._world, [
         objects.Player, objects.Zombie,
         objects.Skeleton, objects.Arrow, objects.Plant])
+    # Phase timings for profile(); None keeps instrumentation to a check.
+    self._profiler = profiler.Profiler() if profile else None
+    self._local_view.profiler = self._profiler
+    self.prewarm()
     self._step = None
     self._player = None
     self._last_health = None
+    self._last_scene = None
     self._unlocked = None
     self.reward_range = None
     self.metadata = None
 
   @property
   def observation_space(self):
+    if self._obs_layout == 'CHW':
+      return BoxSpace(0, 255, self._frame_shape(self._size), np.uint8)
     return BoxSpace(0, 255, tuple(self._size) + (3,), np.uint8)
 
   @property
   def action_space(self):
     return DiscreteSpace(len(constants.actions))
 
+  @property
+  def unwrapped(self):
+    return self
+
   @property
   def action_names(self):
     return constants.actions
@@ -102,77 +172,372 @@ class Env(BaseClass):
     if seed is None:
       seed = np.random.randint(0, 2**31 - 1)
     self._seed = seed
+    self._config['seed'] = int(seed)
     return [seed]
 
-  def reset(self):
+  def reset(self, return_info=False, out=None):
+    prof = self._profiler
+    if prof:
+      start = time.perf_counter()
     center = (self._world.area[0] // 2, self._world.area[1] // 2)
     self._episode += 1
     self._step = 0
-    self._world.reset(seed=hash((self._seed, self._episode)) % (2 ** 31 - 1))
+    seed = hash((self._seed, self._episode)) % (2 ** 31 - 1)
+    self._world.reset(seed=seed)
+    # Spawning the player and painting the layout are not step events.
+    self._world.events = None
     self._update_time()
     self._player = objects.Player(self._world, center)
     self._last_health = self._player.health
     self._world.add(self._player)
     self._unlocked = set()
-    
-    if self._mini_peaceful:
-      self._worldgen.generate_world(self._world, self._player, peaceful=True)
+
+    key = (self._worldgen.__name__, self._area, self._mini_peaceful, seed)
+    layout = None
+    if prof:
+      phase = time.perf_counter()
+    if self._layout_cache is not None:
+      layout = self._layout_cache.get(key)
+    if layout is not None:
+      self._load_layout(layout)
+      worldgen = layout['worldgen'] and dict(layout['worldgen'], cached=True)
     else:
-      self._worldgen.generate_world(self._world, self._player)
-    return self._obs()
+      if self._mini_peaceful:
+        worldgen = self._worldgen.generate_world(
+            self._world, self._player, peaceful=True)
+      else:
+        worldgen = self._worldgen.generate_world(self._world, self._player)
+      if self._layout_cache is not None:
+        self._store_layout(key, worldgen)
+    if prof:
+      prof.lap('worldgen', phase)
+    self._world.events = []
+    obs = self._obs(out)
+    if prof:
+      prof.lap('reset', start)
+    if return_info:
+      # Custom worldgen modules may not report telemetry.
+      return obs, {'worldgen': worldgen}
+    return obs
+
+  def step(self, action, out=None):
+    return self.step_many((action,) * self._action_repeat, out)
 
-  def step(self, action):
+  def step_many(self, actions, out=None):
+    """Apply a sequence of actions as one step and render only the end.
+
+    Rewards are summed and the sequence stops early when the episode ends.
+    The observation and info describe the final state, with the summed
+    reward in info['reward'].
+    """
+    prof = self._profiler
+    if prof:
+      start = time.perf_counter()
+    reward, dead, over = self._advance_many(actions)
+    obs = self._obs(out)
+    info = self._info(reward, dead)
+    if prof:
+      prof.lap('step', start)
+    if not self._reward:
+      reward = 0.0
+    return obs, reward, dead or over, info
+
+  def _advance_many(self, actions):
+    # A new list rather than clear(), so the previous step's events stay
+    # intact for anyone holding on to them.
+    self._world.events = []
+    reward, dead, over = 0.0, False, False
+    for action in actions:
+      step_reward, dead, over = self._advance(action)
+      reward += step_reward
+      if dead or over:
+        break
+    return reward, dead, over
+
+  def _advance(self, action):
+    """Simulate one step without rendering; returns (reward, dead, over)."""
+    prof = self._profiler
+    if prof:
+      start = time.perf_counter()
     self._step += 1
     self._update_time()
     self._player.action = constants.actions[action]
-    for obj in self._world.objects:
-      if self._player.distance(obj) < 2 * max(self._view):
+    # Events of earlier actions in the same step_many() were already counted.
+    first = len(self._world.events)
+    nearby = self._world.objects_within(
+        self._player.pos, self._update_dist - 1)
+    for obj in nearby:
+      if self._player.distance(obj) < self._update_dist:
         obj.update()
+    if prof:
+      start = prof.lap('update', start)
     if self._step % 10 == 0:
-      for chunk, objs in self._world.chunks.items():
+      if self._mini_active_chunks:
+        chunks = self._world.chunks_within(
+            self._player.pos, self._update_dist)
+      else:
+        chunks = self._world.chunks.items()
+      for chunk, objs in chunks:
         if self._mini_peaceful:
           self._balance_chunk_peaceful(chunk, objs)
         else:
           self._balance_chunk(chunk, objs)
-    obs = self._obs()
+      if prof:
+        start = prof.lap('balance', start)
     reward = (self._player.health - self._last_health) / 10
     self._last_health = self._player.health
     unlocked = {
-        name for name, count in self._player.achievements.items()
-        if count > 0 and name not in self._unlocked}
+        event.name for event in self._world.events[first:]
+        if type(event) is events_lib.Achievement and
+        event.name not in self._unlocked}
     if unlocked:
       self._unlocked |= unlocked
       reward += 1.0
     
     dead = self._player.health <= 0
     over = self._length and self._step >= self._length
-    done = dead or over
+    if prof:
+      prof.lap('reward', start)
+    return reward, dead, over
+
+  def _info(self, reward, dead):
+    prof = self._profiler
+    if prof:
+      start = time.perf_counter()
+    semantic = self._sem_view()
+    if prof:
+      start = prof.lap('semantic', start)
     info = {
         'inventory': self._player.inventory.copy(),
         'achievements': self._player.achievements.copy(),
         'discount': 1 - float(dead),
-        'semantic': self._sem_view(),
+        'semantic': semantic,
         'player_pos': self._player.pos,
         'reward': reward,
     }
-    if not self._reward:
-      reward = 0.0
-    return obs, reward, done, info
+    if self._hash_info:
+      info['state_hash'] = self.state_hash()
+    if prof:
+      prof.lap('info', start)
+    return info
+
+  def profile(self, reset=False):
+    """Time per phase since construction or the last profile(reset=True).
+
+    Returns a dict per phase with the call count, total and mean seconds
+    and a log2 histogram, or an empty dict unless created with profile=True.
+    """
+    if not self._profiler:
+      return {}
+    report = self._profiler.report()
+    if reset:
+      self._profiler.reset()
+    return report
+
+  def export_trace(self, filename):
+    """Write the recorded phases as a Chrome trace JSON file."""
+    if not self._profiler:
+      raise RuntimeError('Create the Env with profile=True to record traces.')
+    self._profiler.export_chrome_trace(filename)
+
+  @property
+  def events(self):
+    """Typed events of the last step in order, see mini_crafter.events."""
+    return self._world.events
+
+  def state_hash(self):
+    """64-bit Zobrist hash of the materials, objects and player inventory.
+
+    Maintained incrementally by the world and the inventory, so it costs
+    O(1) per step except right after a reset. Object positions and types
+    are covered, but not their health, cooldowns or facing.
+    """
+    return self._world.hash ^ self._player.inventory.hash
 
-  def render(self, size=None):
-    size = size or self._size
+  def get_state(self):
+    """Snapshot of the simulation state as a flat uint8 array.
+
+    Covers the material map, all objects, the player, step, daylight and
+    the world RNG, but not textures or views, so it is cheap to take and
+    restore for tree search. See mini_crafter.state for the layout.
+    """
+    return state_lib.save(self)
+
+  def set_state(self, state):
+    """Restore a snapshot from get_state() of an env with the same area.
+
+    Objects are rebuilt, so references to objects of the current world
+    (including the player) held outside the env become stale.
+    """
+    state_lib.load(self, state)
+
+  def close(self):
+    pass
+
+  def prewarm(self, size=None):
+    """Resize all textures for rendering at `size` (default: obs size)."""
+    unit = np.array(self._size if size is None else size) // self._view
+    self._textures.prewarm([unit] + engine.ItemView.texture_sizes(unit))
+
+  def frame_stats(self):
+    """Entries, bytes, hits and misses of the frame cache, if enabled."""
+    return self._frame_cache.stats() if self._frame_cache else {}
+
+  def render(self, size=None, out=None):
+    """Draw the current frame in the observation layout.
+
+    With `out`, the frame is composed directly into that uint8 array, which
+    must have the shape of a frame of this size, and `out` is returned.
+    """
+    prof = self._profiler
+    if prof:
+      start = time.perf_counter()
+    if self._frame_cache is not None:
+      frame = self._cached_frame(size, out)
+      if prof:
+        prof.lap('render', start)
+      return frame
+    scene = self._scene()
+    if prof:
+      prof.lap('scene', start)
+    frame = self._compose(scene, size, out=out)
+    if prof:
+      prof.lap('render', start)
+    return frame
+
+  def _scene(self):
+    # Everything render() draws, independent of the output size, so that
+    # one scene can be composed at several resolutions.
+    return (
+        self._local_view.scene(self._player), self._player.inventory.copy())
+
+  def _compose(self, scene, size=None, random=None, out=None):
+    size = np.array(self._size if size is None else size)
     unit = size // self._view
-    canvas = np.zeros(tuple(size) + (3,), np.uint8)
-    local_view = self._local_view(self._player, unit)
-    item_view = self._item_view(self._player.inventory, unit)
-    view = np.concatenate([local_view, item_view], 1)
-    border = (size - (size // self._view) * self._view) // 2
-    (x, y), (w, h) = border, view.shape[:2]
-    canvas[x: x + w, y: y + h] = view
-    return canvas.transpose((1, 0, 2))
-
-  def _obs(self):
-    return self.render()
+    out = self._target(size, out)
+    # Views are drawn in (x, y) order; write them through a transposed view
+    # of the destination instead of transposing a temporary canvas.
+    if self._obs_layout == 'CHW':
+      canvas = out.transpose((2, 1, 0))
+    else:
+      canvas = out.transpose((1, 0, 2))
+    world_scene, inventory = scene
+    local_view = self._local_view.draw(
+        world_scene, unit, random or self._render_random())
+    prof = self._profiler
+    if prof:
+      start = time.perf_counter()
+    item_view = self._item_view(inventory, unit)
+    if prof:
+      start = prof.lap('items', start)
+    border = (size - unit * self._view) // 2
+    (x, y), (w, h) = border, local_view.shape[:2]
+    bottom = y + h + item_view.shape[1]
+    canvas[:x] = 0
+    canvas[x + w:] = 0
+    canvas[x: x + w, :y] = 0
+    canvas[x: x + w, bottom:] = 0
+    canvas[x: x + w, y: y + h] = local_view
+    canvas[x: x + w, y + h: bottom] = item_view
+    if prof:
+      prof.lap('compose', start)
+    return out
+
+  def _cached_frame(self, size=None, out=None):
+    # With a frame cache, daylight is rounded to `daylight_levels` steps and
+    # the night noise is a fixed pattern per level, so that a frame only
+    # depends on the key and hits are exact. The key covers only what is
+    # drawn: the materials and sprites in view and the inventory, so frames
+    # are reused whenever the view repeats, whatever happens elsewhere.
+    size = np.array(self._size if size is None else size)
+    player = self._player
+    level = round(self._world.daylight * self._daylight_levels)
+    key = (
+        self._frame_key, tuple(size.tolist()),
+        self._local_view.scene_key(player), tuple(player.inventory.items()),
+        level, player.sleeping)
+    frame = self._frame_cache.get(key)
+    if frame is None:
+      (cells, sprites, _, sleeping), inventory = self._scene()
+      scene = (
+          (cells, sprites, level / self._daylight_levels, sleeping),
+          inventory)
+      frame = self._compose(scene, size, np.random.RandomState(level))
+      frame.flags.writeable = False
+      self._frame_cache.put(key, frame, frame.nbytes)
+    if out is None:
+      return frame.copy()
+    out = self._target(size, out)
+    out[...] = frame
+    return out
+
+  def _target(self, size, out):
+    shape = self._frame_shape(size)
+    if out is None:
+      return np.empty(shape, np.uint8)
+    if out.shape != shape or out.dtype != np.uint8:
+      raise ValueError(
+          f'Expected a uint8 render target of shape {shape}, got '
+          f'{out.dtype} {out.shape}.')
+    return out
+
+  def _frame_shape(self, size):
+    return frame_shape(size, self._obs_layout)
+
+  def _store_layout(self, key, worldgen):
+    world = self._world
+    mobs = [
+        (type(obj), tuple(int(x) for x in obj.pos))
+        for obj in world.objects if obj is not self._player]
+    layout = {
+        'materials': world._mat_map.copy(),
+        'mobs': mobs,
+        'random': world.random.get_state(),
+        'worldgen': worldgen,
+    }
+    nbytes = (
+        layout['materials'].nbytes + layout['random'][1].nbytes +
+        64 * len(mobs) + 512)
+    self._layout_cache.put(key, layout, nbytes)
+
+  def _load_layout(self, layout):
+    world = self._world
+    np.copyto(world._mat_map, layout['materials'])
+    for cls, pos in layout['mobs']:
+      if issubclass(cls, (objects.Zombie, objects.Skeleton)):
+        world.add(cls(world, pos, self._player))
+      else:
+        world.add(cls(world, pos))
+    world.random.set_state(layout['random'])
+
+  def _checksum(self):
+    """CRC32 of materials, object positions and the player's stats."""
+    world, player = self._world, self._player
+    crc = zlib.crc32(world._mat_map.tobytes())
+    crc = zlib.crc32((world._obj_map > 0).tobytes(), crc)
+    stats = (
+        list(player.pos) + list(player.inventory.values()) +
+        list(player.achievements.values()) + [self._step])
+    return zlib.crc32(np.array(stats, np.int64).tobytes(), crc)
+
+  def _obs(self, out=None):
+    if self._frame_cache is not None:
+      # Hits build no scene; readers of _last_scene fall back to _scene().
+      self._last_scene = None
+      return self._cached_frame(out=out)
+    prof = self._profiler
+    if prof:
+      start = time.perf_counter()
+    self._last_scene = self._scene()
+    if prof:
+      prof.lap('scene', start)
+    return self._compose(self._last_scene, out=out)
+
+  def _render_random(self):
+    # Night noise of the current step. It depends only on the render seed
+    # and the step, so any frame renders the same however the env got to
+    # it, including replays that start from a snapshot.
+    return np.random.default_rng([self._world.render_seed, self._step])
 
   def _update_time(self):
     progress = (self._step / 300) % 1 + 0.3
@@ -228,3 +593,18 @@ class Env(BaseClass):
         away = self._player.distance(obj.pos) >= despan_dist
         if away:
           self._world.remove(obj)
+
+
+def frame_shape(size=(64, 64), obs_layout='HWC'):
+  """Shape of the frames of an Env with this size and layout."""
+  width, height = (int(x) for x in (
+      size if hasattr(size, '__len__') else (size, size)))
+  if obs_layout == 'CHW':
+    return (3, height, width)
+  return (height, width, 3)
+
+
+def _listify(value):
+  if hasattr(value, '__len__'):
+    return [int(x) for x in value]
+  return value
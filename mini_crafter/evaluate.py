@@ -0,0 +1,152 @@
+"""Evaluate a policy over many seeds, modes and difficulty settings.
+
+The policy is called with a batch of observations (B, H, W, 3) from envs
+that run in lockstep and returns one action per observation. Episodes are
+grouped into chunks of `batch` seeds per (mode, peaceful) condition, and
+chunks are fanned out over a process pool. The chunking only depends on the
+seed list, and a policy with a `reset(seed)` method is reset with a seed
+derived from the chunk before running it, so results are identical for any
+number of processes.
+
+  python -m mini_crafter.evaluate --seeds 100 --processes 4
+"""
+
+import argparse
+import concurrent.futures
+import time
+import zlib
+
+import numpy as np
+
+from . import env as env_lib
+from . import stats
+
+
+class RandomPolicy:
+
+  def __init__(self, seed=0, actions=17):
+    self._random = np.random.RandomState(seed)
+    self._actions = actions
+
+  def reset(self, seed):
+    self._random = np.random.RandomState(seed)
+
+  def __call__(self, obs):
+    return self._random.randint(0, self._actions, len(obs))
+
+
+def evaluate(
+    policy, seeds, modes=('mdp', 'pomdp'), peaceful=(False, True),
+    processes=1, batch=16, **kwargs):
+  """Run one episode per seed and condition and summarize the results.
+
+  Returns a dict with the per-episode results under 'episodes', a summary
+  per condition under 'conditions' (keyed like 'mdp' or 'pomdp-peaceful')
+  and the summary over all episodes under 'overall'. Every summary holds
+  the success rates, score, episode lengths and steps per second, which is
+  per process for conditions and overall wall-clock throughput for
+  'overall'. Extra keyword arguments are passed on to Env.
+  """
+  seeds = [int(seed) for seed in seeds]
+  chunks = [
+      (policy, mode, calm, seeds[i: i + batch], kwargs)
+      for mode in modes for calm in peaceful
+      for i in range(0, len(seeds), batch)]
+  start = time.perf_counter()
+  if processes > 1:
+    with concurrent.futures.ProcessPoolExecutor(processes) as pool:
+      results = list(pool.map(_run_chunk, chunks))
+  else:
+    results = [_run_chunk(chunk) for chunk in chunks]
+  duration = time.perf_counter() - start
+  episodes = [episode for result, _ in results for episode in result]
+  conditions = {}
+  for mode in modes:
+    for calm in peaceful:
+      name = mode + ('-peaceful' if calm else '')
+      selected = [
+          (result, seconds) for result, seconds in results
+          if result[0]['mode'] == mode and result[0]['peaceful'] == calm]
+      conditions[name] = _summarize(
+          [episode for result, _ in selected for episode in result],
+          sum(seconds for _, seconds in selected))
+  return {
+      'episodes': episodes,
+      'conditions': conditions,
+      'overall': _summarize(episodes, duration),
+  }
+
+
+def _run_chunk(args):
+  policy, mode, peaceful, seeds, kwargs = args
+  if hasattr(policy, 'reset'):
+    policy.reset(zlib.crc32(f'{mode}-{peaceful}-{seeds[0]}'.encode()))
+  envs = [
+      env_lib.Env(seed=seed, mode=mode, peaceful=peaceful, **kwargs)
+      for seed in seeds]
+  obs = [env.reset() for env in envs]
+  lengths = [0] * len(envs)
+  rewards = [0.0] * len(envs)
+  active = list(range(len(envs)))
+  episodes = [None] * len(envs)
+  start = time.perf_counter()
+  while active:
+    actions = policy(np.stack([obs[i] for i in active]))
+    for i, action in zip(list(active), actions):
+      obs[i], reward, done, info = envs[i].step(int(action))
+      lengths[i] += 1
+      rewards[i] += reward
+      if done:
+        active.remove(i)
+        episodes[i] = {
+            'mode': mode, 'peaceful': peaceful, 'seed': seeds[i],
+            'length': lengths[i], 'reward': rewards[i]}
+        for key, value in info['achievements'].items():
+          episodes[i][f'achievement_{key}'] = value
+  return episodes, time.perf_counter() - start
+
+
+def _summarize(episodes, duration):
+  if not episodes:
+    return {'episodes': 0}
+  columns = {
+      key: np.array([episode[key] for episode in episodes], np.float64)
+      for key in episodes[0]
+      if key == 'length' or key == 'reward' or key.startswith('achievement_')}
+  lengths = columns['length']
+  return {
+      'episodes': len(episodes),
+      'score': stats.score(columns),
+      'success_rates': stats.success_rates(columns),
+      'length_mean': float(lengths.mean()),
+      'length_std': float(lengths.std()),
+      'reward_mean': float(columns['reward'].mean()),
+      'steps': int(lengths.sum()),
+      'steps_per_second': float(lengths.sum() / duration),
+  }
+
+
+def main():
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--seeds', type=int, default=100)
+  parser.add_argument('--first-seed', type=int, default=0)
+  parser.add_argument('--modes', nargs='+', default=['mdp', 'pomdp'])
+  parser.add_argument('--processes', type=int, default=1)
+  parser.add_argument('--batch', type=int, default=16)
+  parser.add_argument('--length', type=int, default=10000)
+  args = parser.parse_args()
+  seeds = range(args.first_seed, args.first_seed + args.seeds)
+  result = evaluate(
+      RandomPolicy(), seeds, args.modes, processes=args.processes,
+      batch=args.batch, length=args.length)
+  for name, summary in list(result['conditions'].items()) + [
+      ('overall', result['overall'])]:
+    print(
+        f"{name:16} episodes {summary['episodes']:5d}  "
+        f"score {summary['score']:6.2f}  "
+        f"length {summary['length_mean']:8.1f}  "
+        f"steps/s {summary['steps_per_second']:8.1f}")
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,19 @@
+"""Typed events emitted where World and Player change the simulation.
+
+Env.events lists the events of the last step (or of a whole step_many()
+sequence) in the order they happened, so consumers can react to changes
+without diffing the achievement or inventory dicts. Positions are (x, y)
+tuples and objects are named by their class. World generation, whether
+through World.paint() or item by item, is not recorded at all, and
+Env.reset() starts with an empty list.
+"""
+
+import collections
+
+# An achievement counter was incremented to `count`; 1 means unlocked.
+Achievement = collections.namedtuple('Achievement', 'name, count')
+MaterialChanged = collections.namedtuple('MaterialChanged', 'pos, old, new')
+ObjectAdded = collections.namedtuple('ObjectAdded', 'pos, name')
+ObjectRemoved = collections.namedtuple('ObjectRemoved', 'pos, name')
+# An object's health dropped by `amount` to `health`.
+Damage = collections.namedtuple('Damage', 'pos, name, amount, health')
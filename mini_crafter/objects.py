@@ -1,7 +1,40 @@
+import functools
+
 import numpy as np
 
 from . import constants
 from . import engine
+from . import events
+
+
+class Inventory(dict):
+  """Item counts that keep a Zobrist hash of their contents.
+
+  Only item assignment is tracked, which is how objects change their
+  inventory. Copies made with copy() are plain dicts.
+  """
+
+  def __init__(self, items=()):
+    super().__init__(items)
+    self.hash = 0
+    for name, value in self.items():
+      self.hash ^= _item_key(name, value)
+
+  def __setitem__(self, name, value):
+    old = self.get(name)
+    if old is None or old != value:
+      if old is not None:
+        self.hash ^= _item_key(name, old)
+      self.hash ^= _item_key(name, value)
+    super().__setitem__(name, value)
+
+  def __reduce__(self):
+    return (type(self), (dict(self),))
+
+
+@functools.lru_cache(4096)
+def _item_key(name, value):
+  return engine.zobrist(name, value)
 
 
 class Object:
@@ -27,7 +60,11 @@ class Object:
 
   @health.setter
   def health(self, value):
-    self.inventory['health'] = value 
+    damage = self.inventory['health'] - value
+    self.inventory['health'] = value
+    if damage > 0 and self.world.events is not None:
+      self.world.events.append(events.Damage(
+          tuple(self.pos.tolist()), type(self).__name__, damage, value))
 
   @property
   def all_dirs(self):
@@ -70,8 +107,8 @@ class Player(Object):
   def __init__(self, world, pos):
     super().__init__(world, pos)
     self.facing = (0, 1)
-    self.inventory = {
-        name: info['initial'] for name, info in constants.items.items()}
+    self.inventory = Inventory(
+        (name, info['initial']) for name, info in constants.items.items())
     self.achievements = {name: 0 for name in constants.achievements}
     self.action = 'noop'
     self.sleeping = False
@@ -136,6 +173,16 @@ class Player(Object):
   def _degen_or_regen_health(self):
     pass
 
+  def _achieve(self, name):
+    # Achievements commented out in data.yaml (such as defeat_zombie) are
+    # not tracked.
+    if name not in self.achievements:
+      return
+    self.achievements[name] += 1
+    if self.world.events is not None:
+      self.world.events.append(
+          events.Achievement(name, self.achievements[name]))
+
   def _wake_up_when_hurt(self):
     if self.health < self._last_health:
       self.sleeping = False
@@ -159,19 +206,19 @@ class Player(Object):
       if obj.ripe:
         obj.grown = 0
         self.inventory['food'] += 4
-        self.achievements['eat_plant'] += 1
+        self._achieve('eat_plant')
     if isinstance(obj, Fence):
       self.world.remove(obj)
       self.inventory['fence'] += 1
-      self.achievements['collect_fence'] += 1
+      self._achieve('collect_fence')
     if isinstance(obj, Zombie):
       obj.health -= damage
       if obj.health <= 0:
-        self.achievements['defeat_zombie'] += 1
+        self._achieve('defeat_zombie')
     if isinstance(obj, Skeleton):
       obj.health -= damage
       if obj.health <= 0:
-        self.achievements['defeat_skeleton'] += 1
+        self._achieve('defeat_skeleton')
     # if isinstance(obj, Cow):
     #   obj.health -= damage
     #   if obj.health <= 0:
@@ -193,7 +240,7 @@ class Player(Object):
     if self.random.uniform() <= info.get('probability', 1):
       for name, amount in info['receive'].items():
         self.inventory[name] += amount
-        self.achievements[f'collect_{name}'] += 1
+        self._achieve(f'collect_{name}')
 
   def _place(self, name, target, material):
     if self.world[target][1]:
@@ -213,7 +260,7 @@ class Player(Object):
           'plant': Plant,
       }[name]
       self.world.add(cls(self.world, target))
-    self.achievements[f'place_{name}'] += 1
+    self._achieve(f'place_{name}')
 
   def _make(self, name):
     nearby, _ = self.world.nearby(self.pos, 1)
@@ -225,7 +272,7 @@ class Player(Object):
     for item, amount in info['uses'].items():
       self.inventory[item] -= amount
     self.inventory[name] += info['gives']
-    self.achievements[f'make_{name}'] += 1
+    self._achieve(f'make_{name}')
 
 class Zombie(Object):
 
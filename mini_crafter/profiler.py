@@ -0,0 +1,69 @@
+"""Opt-in wall-time profiling of the phases of Env.reset, step and render.
+
+Env(profile=True) attaches a Profiler that the environment and its views
+report phase times to. Without it, every instrumentation point costs a
+single attribute check. Phases nest: 'step' contains 'update', 'balance',
+'reward', 'scene', 'terrain', 'lighting', 'items', 'compose', 'semantic'
+and 'info'; 'reset' contains 'worldgen' and the phases of the first frame.
+"""
+
+import bisect
+import collections
+import json
+import os
+import threading
+import time
+
+
+class Profiler:
+
+  # Histogram bucket i counts times below EDGES[i] seconds (last: above).
+  EDGES = tuple(2.0 ** e for e in range(-20, 1))
+
+  def __init__(self, max_events=100000):
+    self._max_events = max_events
+    self.reset()
+
+  def reset(self):
+    self._total = collections.Counter()
+    self._count = collections.Counter()
+    self._hist = collections.defaultdict(
+        lambda: [0] * (len(self.EDGES) + 1))
+    self._events = []
+
+  def lap(self, phase, start):
+    """Record the phase as lasting from `start` until now; returns now."""
+    now = time.perf_counter()
+    seconds = now - start
+    self._total[phase] += seconds
+    self._count[phase] += 1
+    self._hist[phase][bisect.bisect_right(self.EDGES, seconds)] += 1
+    if len(self._events) < self._max_events:
+      self._events.append((phase, start, seconds))
+    return now
+
+  def report(self):
+    """Plain-dict summary per phase, safe to dump as JSON."""
+    return {
+        phase: {
+            'count': self._count[phase],
+            'total': total,
+            'mean': total / self._count[phase],
+            'hist': {
+                'edges': list(self.EDGES),
+                'counts': list(self._hist[phase])},
+        }
+        for phase, total in self._total.most_common()}
+
+  def export_chrome_trace(self, filename):
+    """Write the recorded phases as Chrome trace events (chrome://tracing).
+
+    Only the first `max_events` phases since the last reset are kept.
+    """
+    pid, tid = os.getpid(), threading.get_ident()
+    events = [
+        {'name': phase, 'ph': 'X', 'pid': pid, 'tid': tid,
+         'ts': 1e6 * start, 'dur': 1e6 * seconds}
+        for phase, start, seconds in self._events]
+    with open(filename, 'w') as f:
+      json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
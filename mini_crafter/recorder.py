@@ -1,45 +1,186 @@
 import datetime
-import json
+import os
 import pathlib
+import queue
+import shutil
+import threading
+import uuid
+import warnings
+import zipfile
 
-import imageio
 import numpy as np
-import gym
 
+from . import codec as codec_lib
+from . import replay
+from . import stats as stats_lib
 
-class Recorder(gym.Wrapper):
+try:
+  import gym
+  Wrapper = gym.Wrapper
+except ImportError:
+
+  class Wrapper:
+
+    # The parts of gym.Wrapper that the recorders use, for when gym is not
+    # installed.
+
+    def __init__(self, env):
+      self.env = env
+
+    def __getattr__(self, name):
+      if name.startswith('_'):
+        raise AttributeError(name)
+      return getattr(self.env, name)
+
+    @property
+    def unwrapped(self):
+      return self.env.unwrapped
+
+    def reset(self, **kwargs):
+      return self.env.reset(**kwargs)
+
+    def step(self, action):
+      return self.env.step(action)
+
+    def close(self):
+      return self.env.close()
+
+
+class Recorder(Wrapper):
+
+  # Writes the same files as stacking ReplayRecorder, StatsRecorder,
+  # VideoRecorder and EpisodeRecorder, but handles each step once: the
+  # achievement scan is shared by the stats line and the episode name, and
+  # video frames are composed from the scene of the observation instead of
+  # walking the world a second time. Night noise is seeded per step, so
+  # video frames match the observations and recording changes nothing.
+  # Stats are batched `flush_every` episodes at a time; buffered ones are
+  # written on close() or, failing that, when the writer is collected.
 
   def __init__(
       self, env, directory, save_stats=True, save_video=True,
-      save_episode=True, video_size=(512, 512), fps=30):
-    if directory and save_stats:
-      env = StatsRecorder(env, directory)
-    if directory and save_video:
-      env = VideoRecorder(env, directory, video_size, fps=fps)
-    if directory and save_episode:
-      env = EpisodeRecorder(env, directory)
+      save_episode=True, video_size=(512, 512), fps=30, save_replay=False,
+      checksum_every=100, snapshot_every=1000, flush_every=100, block=True):
     super().__init__(env)
+    self._env = env
+    self._directory = directory and pathlib.Path(directory).expanduser()
+    if self._directory:
+      self._directory.mkdir(exist_ok=True, parents=True)
+    self._stats = None
+    if self._directory and save_stats:
+      self._stats = stats_lib.Writer(
+          self._directory, flush_every=flush_every)
+    self._video = None
+    if self._directory and save_video:
+      self._video = _VideoWriter(fps, 64, block)
+      env.unwrapped.prewarm(video_size)
+    self._episode = None
+    if self._directory and save_episode:
+      self._episode = _EpisodeWriter(self._directory, 256)
+    self._replay = bool(self._directory and save_replay)
+    self._video_size = video_size
+    self._checksum_every = checksum_every
+    self._snapshot_every = snapshot_every
+    self._episodes = 0
+    self._length = None
+    self._reward = None
+    self._actions = None
+    self._checksums = None
+    self._snapshots = None
 
+  @property
+  def dropped_frames(self):
+    return self._video.dropped if self._video else 0
+
+  def reset(self):
+    obs = self._env.reset()
+    unwrapped = self._env.unwrapped
+    self._episodes += 1
+    self._length = 0
+    self._reward = 0
+    if self._video:
+      timestamp = datetime.datetime.now().strftime('%Y%m%dT%H%M%S')
+      filename = f'{timestamp}-{self._episodes:04d}.mp4'
+      self._video.open(self._directory / filename)
+      self._write_frame(unwrapped)
+    if self._episode:
+      self._episode.begin({'image': obs})
+    if self._replay:
+      self._actions = []
+      self._checksums = {0: unwrapped._checksum()}
+      self._snapshots = {}
+    return obs
+
+  def step(self, action):
+    obs, reward, done, info = self._env.step(action)
+    unwrapped = self._env.unwrapped
+    self._length += 1
+    self._reward += info['reward']
+    if self._video:
+      self._write_frame(unwrapped)
+    if self._episode:
+      self._episode.append(_transition(action, obs, reward, done, info))
+    if self._replay:
+      self._actions.append(int(action))
+      if done or (
+          self._checksum_every and self._length % self._checksum_every == 0):
+        self._checksums[self._length] = unwrapped._checksum()
+      if self._snapshot_every and self._length % self._snapshot_every == 0:
+        self._snapshots[self._length] = unwrapped.get_state()
+    if done:
+      self._finish(unwrapped, info)
+    return obs, reward, done, info
+
+  def close(self):
+    if self._video:
+      self._video.close()
+    if self._episode:
+      self._episode.close()
+    if self._stats:
+      self._stats.close()
+    self.env.close()
 
-class StatsRecorder(gym.Wrapper):
+  def _write_frame(self, unwrapped):
+    scene = unwrapped._last_scene or unwrapped._scene()
+    frame = unwrapped._compose(scene, self._video_size)
+    self._video.write(_video_frame(unwrapped, frame))
 
-  def __init__(self, env, directory):
+  def _finish(self, unwrapped, info):
+    achievements = info['achievements']
+    unlocked = sum(int(v >= 1) for v in achievements.values())
+    timestamp = datetime.datetime.now().strftime('%Y%m%dT%H%M%S')
+    name = f'{timestamp}-ach{unlocked}-len{self._length}'
+    if self._stats:
+      self._stats.add(_stats(self._length, self._reward, info))
+    if self._video:
+      self._video.finish()
+    if self._episode:
+      self._episode.end(name + '.npz')
+    if self._replay:
+      replay.save(
+          self._directory / (name + '.replay.npz'), unwrapped._config,
+          unwrapped._episode, self._actions, self._checksums,
+          self._snapshots)
+
+
+class StatsRecorder(Wrapper):
+
+  # Each instance writes its own stats-<worker>.jsonl and binary sidecar
+  # (see stats.py), so that many actors can share a directory. Episodes are
+  # appended as they finish; raise `flush_every` to batch them instead.
+  # Read them back with stats.load().
+
+  def __init__(self, env, directory, worker=None, flush_every=1):
     super().__init__(env)
     self._env = env
-    self._directory = pathlib.Path(directory).expanduser()
-    self._directory.mkdir(exist_ok=True, parents=True)
-    self._file = (self._directory / 'stats.jsonl').open('a')
+    self._writer = stats_lib.Writer(directory, worker, flush_every)
     self._length = None
     self._reward = None
-    self._unlocked = None
-    self._stats = None
 
   def reset(self):
     obs = self._env.reset()
     self._length = 0
     self._reward = 0
-    self._unlocked = None
-    self._stats = None
     return obs
 
   def step(self, action):
@@ -47,64 +188,177 @@ class StatsRecorder(gym.Wrapper):
     self._length += 1
     self._reward += info['reward']
     if done:
-      self._stats = {'length': self._length, 'reward': round(self._reward, 1)}
-      for key, value in info['achievements'].items():
-        self._stats[f'achievement_{key}'] = value
-      self._save()
+      self._writer.add(_stats(self._length, self._reward, info))
     return obs, reward, done, info
 
-  def _save(self):
-    self._file.write(json.dumps(self._stats) + '\n')
-    self._file.flush()
+  def close(self):
+    self._writer.close()
+    self.env.close()
+
 
+class VideoRecorder(Wrapper):
 
-class VideoRecorder(gym.Wrapper):
+  # Writes one video per episode. Frames are streamed through a bounded
+  # queue to a writer thread that feeds the ffmpeg encoder process, so
+  # memory stays constant and the step loop only waits for encoding when
+  # the queue is full. With block=False, frames are dropped instead of
+  # waiting, counted in `dropped_frames` and warned about on close().
 
-  def __init__(self, env, directory, size=(512, 512), fps=30):
+  def __init__(
+      self, env, directory, size=(512, 512), fps=30, queue_size=64,
+      block=True):
     super().__init__(env)
     self._env = env
     self._directory = pathlib.Path(directory).expanduser()
     self._directory.mkdir(exist_ok=True, parents=True)
     self._size = size
-    self._fps = fps
-    self._frames = None
+    self._writer = _VideoWriter(fps, queue_size, block)
+    env.unwrapped.prewarm(size)
+    self._episodes = 0
+
+  @property
+  def dropped_frames(self):
+    return self._writer.dropped
 
   def reset(self):
     obs = self._env.reset()
-    self._frames = [self._env.render(self._size)]
+    self._episodes += 1
+    timestamp = datetime.datetime.now().strftime('%Y%m%dT%H%M%S')
+    filename = f'{timestamp}-{self._episodes:04d}.mp4'
+    self._writer.open(self._directory / filename)
+    self._writer.write(
+        _video_frame(self.env.unwrapped, self._env.render(self._size)))
     return obs
 
   def step(self, action):
     obs, reward, done, info = self._env.step(action)
-    self._frames.append(self._env.render(self._size))
+    self._writer.write(
+        _video_frame(self.env.unwrapped, self._env.render(self._size)))
+    if done:
+      self._writer.finish()
     return obs, reward, done, info
-  
+
   def close(self):
-    self._save()
+    self._writer.close()
     self.env.close()
 
-  def _save(self):
-    if not self._frames:
+
+class _VideoWriter:
+
+  def __init__(self, fps, queue_size, block):
+    self._fps = fps
+    self._block = block
+    self._queue = queue.Queue(queue_size)
+    self._thread = None
+    self._error = None
+    self._active = False
+    self.dropped = 0
+
+  def open(self, filename):
+    self._check()
+    if self._thread is None:
+      self._thread = threading.Thread(target=self._run, daemon=True)
+      self._thread.start()
+    self._queue.put(('open', str(filename)))
+    self._active = True
+
+  def write(self, frame):
+    if not self._active:
       return
-    timestamp = datetime.datetime.now().strftime('%Y%m%dT%H%M%S')
-    filename = str(self._directory / (timestamp + '.mp4'))
-    imageio.mimsave(filename, self._frames, fps=self._fps)
+    if self._block:
+      self._queue.put(('frame', frame))
+      return
+    try:
+      self._queue.put_nowait(('frame', frame))
+    except queue.Full:
+      self.dropped += 1
+
+  def finish(self):
+    if self._active:
+      self._queue.put(('finish', None))
+      self._active = False
+
+  def close(self):
+    if self._thread is None:
+      return
+    self._queue.put(('stop', None))
+    self._thread.join()
+    self._thread = None
+    self._active = False
+    if self.dropped:
+      warnings.warn(
+          f'Dropped {self.dropped} video frames because the encoder fell '
+          'behind; pass block=True to keep every frame.')
+    self._check()
+
+  def _check(self):
+    if self._error:
+      error, self._error = self._error, None
+      raise error
+
+  def _run(self):
+    writer = None
+    while True:
+      kind, payload = self._queue.get()
+      try:
+        if kind == 'frame' and writer:
+          writer.append_data(payload)
+        elif kind in ('open', 'finish', 'stop') and writer:
+          writer.close()
+          writer = None
+        if kind == 'open':
+          # Imported here, on the writer thread, since only videos need it.
+          import imageio
+          writer = imageio.get_writer(payload, fps=self._fps)
+      except Exception as e:
+        self._error = e
+        writer = None
+      if kind == 'stop':
+        return
 
 
-class EpisodeRecorder(gym.Wrapper):
+class EpisodeRecorder(Wrapper):
 
-  def __init__(self, env, directory):
+  # Transitions are written into typed per-key column buffers allocated from
+  # the first transition. Every `chunk` steps the filled buffers are handed
+  # to a writer thread that appends them to temporary files and, at the end
+  # of the episode, streams them into the same compressed .npz layout that
+  # np.savez_compressed produces. Memory and the latency of the final step
+  # do not grow with the episode length.
+
+  # With codec='delta', images and semantic maps are stored as keyframes
+  # plus changed view tiles (see codec.py); read them with
+  # codec.load_episode(). On 1000-step pomdp episodes the files are only
+  # about 1.25x smaller than the default layout, and a random frame costs
+  # up to `keyframe_every - 1` tile replays: about 0.3 ms at 16, 1 ms at 64.
+  # Sequential reads cost one replay per frame either way.
+
+  def __init__(
+      self, env, directory, chunk=256, codec=None, keyframe_every=16):
     super().__init__(env)
     if not hasattr(env, 'episode_name'):
       env = EpisodeName(env)
     self._env = env
     self._directory = pathlib.Path(directory).expanduser()
     self._directory.mkdir(exist_ok=True, parents=True)
-    self._episode = None
+    codecs = None
+    if codec == 'delta':
+      if env.unwrapped._obs_layout != 'HWC':
+        raise ValueError("codec='delta' expects obs_layout='HWC'.")
+      tile, offset = _image_tiling(env.unwrapped)
+      codecs = {
+          'image': lambda: codec_lib.DeltaEncoder(
+              tile, offset, keyframe_every),
+          'semantic': lambda: codec_lib.DeltaEncoder(
+              (1, 1), (0, 0), keyframe_every),
+      }
+    elif codec is not None:
+      raise ValueError(f"codec must be None or 'delta', got {codec}")
+    self._writer = _EpisodeWriter(self._directory, chunk, codecs)
 
   def reset(self):
     obs = self._env.reset()
-    self._episode = [{'image': obs}]
+    self._writer.begin({'image': obs})
     return obs
 
   def step(self, action):
@@ -112,35 +366,279 @@ class EpisodeRecorder(gym.Wrapper):
     # transition contains the action and the resulting reward and next
     # observation produced by the environment in response to said action.
     obs, reward, done, info = self._env.step(action)
-    transition = {
-        'action': action, 'image': obs, 'reward': reward, 'done': done,
-    }
-    for key, value in info.items():
-      if key in ('inventory', 'achievements'):
+    self._writer.append(_transition(action, obs, reward, done, info))
+    if done:
+      self._writer.end(self._env.episode_name + '.npz')
+    return obs, reward, done, info
+
+  def close(self):
+    self._writer.close()
+    self.env.close()
+
+
+def _stats(length, reward, info):
+  stats = {'length': length, 'reward': round(reward, 1)}
+  for key, value in info['achievements'].items():
+    stats[f'achievement_{key}'] = value
+  return stats
+
+
+def _video_frame(env, frame):
+  # Frames follow the observation layout, but encoders need (H, W, 3).
+  if env._obs_layout == 'CHW':
+    return np.ascontiguousarray(frame.transpose((1, 2, 0)))
+  return frame
+
+
+def _transition(action, obs, reward, done, info):
+  transition = {
+      'action': action, 'image': obs, 'reward': reward, 'done': done,
+  }
+  for key, value in info.items():
+    if key in ('inventory', 'achievements'):
+      continue
+    transition[key] = value
+  for key, value in info['achievements'].items():
+    transition[f'achievement_{key}'] = value
+  for key, value in info['inventory'].items():
+    transition[f'ainventory_{key}'] = value
+  return transition
+
+
+def _image_tiling(env):
+  # Tile size and leading padding that align the codec's tile grid with the
+  # view grid of an (H, W, 3) observation.
+  unit = env._size // env._view
+  border = (env._size - unit * env._view) // 2
+  tile = (int(unit[1]), int(unit[0]))
+  offset = (int(-border[1] % unit[1]), int(-border[0] % unit[0]))
+  return tile, offset
+
+
+class _Column:
+
+  def __init__(self, dtype, shape, chunk, index):
+    if dtype == object:
+      raise TypeError('Cannot record values of dtype object.')
+    self.dtype = dtype
+    self.shape = shape
+    self.index = index
+    self.rows = 0
+    self._chunk = chunk
+    self._buffer = np.empty((chunk,) + self.shape, self.dtype)
+    self._filled = 0
+
+  def append(self, value):
+    """Store one row; returns the buffer once it holds a full chunk."""
+    self._buffer[self._filled] = value
+    self._filled += 1
+    self.rows += 1
+    if self._filled == self._chunk:
+      return self.take()
+    return None
+
+  def extend(self, rows):
+    """Store several rows; returns the list of chunks that filled up."""
+    full = []
+    while len(rows):
+      amount = min(len(rows), self._chunk - self._filled)
+      self._buffer[self._filled: self._filled + amount] = rows[:amount]
+      self._filled += amount
+      self.rows += amount
+      rows = rows[amount:]
+      if self._filled == self._chunk:
+        full.append(self.take())
+    return full
+
+  def take(self):
+    full = self._buffer[:self._filled]
+    self._buffer = np.empty((self._chunk,) + self.shape, self.dtype)
+    self._filled = 0
+    return full
+
+
+class _EpisodeWriter:
+
+  # Keys listed in `codecs` map to a factory of a streaming encoder (see
+  # codec.DeltaEncoder) whose outputs are stored under `key.suffix`.
+
+  def __init__(self, directory, chunk, codecs=None, queue_size=16):
+    self._directory = directory
+    self._chunk = chunk
+    self._codecs = codecs or {}
+    self._queue = queue.Queue(queue_size)
+    self._thread = None
+    self._error = None
+    self._first = None
+    self._columns = None
+    self._encoders = None
+    self._tmpdir = None
+
+  def begin(self, first):
+    self._check()
+    if self._thread is None:
+      self._thread = threading.Thread(target=self._run, daemon=True)
+      self._thread.start()
+    if self._tmpdir:
+      self._queue.put(('abort', self._tmpdir, None))
+    self._tmpdir = self._directory / f'.episode-{uuid.uuid4().hex}'
+    self._first = first
+    self._columns = None
+    self._encoders = {
+        key: factory() for key, factory in self._codecs.items()}
+
+  def append(self, row):
+    if self._columns is None:
+      # Fill in zeros for keys missing at the first time step.
+      for key, value in row.items():
+        if key not in self._first:
+          self._first[key] = np.zeros_like(value)
+      self._columns = {}
+      self._append(self._first)
+    self._append(row)
+
+  def end(self, filename):
+    for column in self._columns.values():
+      if column._filled:
+        self._submit(column, column.take())
+    specs = [
+        (key, column.dtype, (column.rows,) + column.shape, column.index)
+        for key, column in self._columns.items()]
+    self._queue.put(('finish', self._tmpdir, (self._directory / filename, specs)))
+    self._tmpdir = None
+    self._columns = None
+    self._check()
+
+  def close(self):
+    if self._thread is None:
+      return
+    if self._tmpdir:
+      self._queue.put(('abort', self._tmpdir, None))
+      self._tmpdir = None
+    self._queue.put(('stop', None, None))
+    self._thread.join()
+    self._thread = None
+    self._check()
+
+  def _append(self, row):
+    for key in self._first:
+      value = row[key]
+      encoder = self._encoders.get(key)
+      if encoder is None:
+        value = np.asarray(value)
+        column = self._column(key, value.dtype, value.shape)
+        full = column.append(value)
+        if full is not None:
+          self._submit(column, full)
         continue
-      transition[key] = value
-    for key, value in info['achievements'].items():
-      transition[f'achievement_{key}'] = value
-    for key, value in info['inventory'].items():
-      transition[f'ainventory_{key}'] = value
-    self._episode.append(transition)
+      for suffix, rows in encoder.encode(value).items():
+        column = self._column(f'{key}.{suffix}', rows.dtype, rows.shape[1:])
+        for full in column.extend(rows):
+          self._submit(column, full)
+
+  def _column(self, key, dtype, shape):
+    column = self._columns.get(key)
+    if column is None:
+      column = _Column(dtype, shape, self._chunk, len(self._columns))
+      self._columns[key] = column
+    return column
+
+  def _submit(self, column, rows):
+    self._queue.put(('chunk', self._tmpdir / f'{column.index}.bin', rows))
+
+  def _check(self):
+    if self._error:
+      error, self._error = self._error, None
+      raise error
+
+  def _run(self):
+    while True:
+      kind, path, payload = self._queue.get()
+      try:
+        if kind == 'chunk':
+          path.parent.mkdir(exist_ok=True)
+          with path.open('ab') as f:
+            f.write(payload.tobytes())
+        elif kind == 'finish':
+          _write_npz(path, *payload)
+        if kind in ('finish', 'abort'):
+          shutil.rmtree(path, ignore_errors=True)
+      except Exception as e:
+        self._error = e
+      if kind == 'stop':
+        return
+
+
+def _write_npz(tmpdir, filename, specs, blocksize=1 << 20):
+  # Same layout as np.savez_compressed, streamed from the raw column files.
+  partial = filename.with_name(filename.name + '.part')
+  with zipfile.ZipFile(
+      partial, 'w', zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+    for key, dtype, shape, index in specs:
+      with archive.open(key + '.npy', 'w', force_zip64=True) as f:
+        np.lib.format.write_array_header_1_0(f, {
+            'descr': np.lib.format.dtype_to_descr(dtype),
+            'fortran_order': False, 'shape': shape})
+        source = tmpdir / f'{index}.bin'
+        if not source.exists():
+          continue
+        with source.open('rb') as data:
+          shutil.copyfileobj(data, f, blocksize)
+  os.replace(partial, filename)
+
+
+class ReplayRecorder(Wrapper):
+
+  # Stores each episode as the Env config, its episode index and the action
+  # sequence, plus a state checksum every `checksum_every` steps and a state
+  # snapshot every `snapshot_every` steps for seeking. Use replay.replay()
+  # to re-simulate an episode into frames, semantic maps or infos. Wrap the
+  # Env directly, so that recorded actions are the ones it receives.
+
+  def __init__(self, env, directory, checksum_every=100, snapshot_every=1000):
+    super().__init__(env)
+    if not hasattr(env, 'episode_name'):
+      env = EpisodeName(env)
+    self._env = env
+    self._directory = pathlib.Path(directory).expanduser()
+    self._directory.mkdir(exist_ok=True, parents=True)
+    self._checksum_every = checksum_every
+    self._snapshot_every = snapshot_every
+    self._episode = None
+    self._actions = None
+    self._checksums = None
+    self._snapshots = None
+
+  def reset(self):
+    obs = self._env.reset()
+    unwrapped = self._env.unwrapped
+    self._episode = unwrapped._episode
+    self._actions = []
+    self._checksums = {0: unwrapped._checksum()}
+    self._snapshots = {}
+    return obs
+
+  def step(self, action):
+    obs, reward, done, info = self._env.step(action)
+    self._actions.append(int(action))
+    step = len(self._actions)
+    unwrapped = self._env.unwrapped
+    if done or (self._checksum_every and step % self._checksum_every == 0):
+      self._checksums[step] = unwrapped._checksum()
+    if self._snapshot_every and step % self._snapshot_every == 0:
+      self._snapshots[step] = unwrapped.get_state()
     if done:
       self._save()
     return obs, reward, done, info
 
   def _save(self):
-    filename = str(self._directory / (self._env.episode_name + '.npz'))
-    # Fill in zeros for keys missing at the first time step.
-    for key, value in self._episode[1].items():
-      if key not in self._episode[0]:
-        self._episode[0][key] = np.zeros_like(value)
-    episode = {
-        k: np.array([step[k] for step in self._episode])
-        for k in self._episode[0]}
-    np.savez_compressed(filename, **episode)
-
-
-class EpisodeName(gym.Wrapper):
+    filename = self._directory / (self._env.episode_name + '.replay.npz')
+    replay.save(
+        filename, self._env.unwrapped._config, self._episode, self._actions,
+        self._checksums, self._snapshots)
+
+
+class EpisodeName(Wrapper):
 
   def __init__(self, env):
     super().__init__(env)
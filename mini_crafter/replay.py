@@ -0,0 +1,113 @@
+"""Compact action-log episodes that are re-simulated on demand.
+
+An episode is fully determined by the Env constructor arguments, the episode
+index and the action sequence. recorder.ReplayRecorder stores those together
+with periodic state checksums (to detect divergence) and state snapshots
+in the flat format of mini_crafter.state (to seek without simulating from
+the start). Files hold only arrays and JSON, so loading one never unpickles.
+"""
+
+import json
+
+import numpy as np
+
+from . import env as env_lib
+
+OUTPUTS = ('image', 'semantic', 'info')
+
+
+def save(filename, config, episode, actions, checksums, snapshots):
+  checksums = sorted(checksums.items())
+  snapshots = sorted(snapshots.items())
+  arrays = {
+      'config': np.array(json.dumps(config)),
+      'episode': np.array(episode, np.int64),
+      'actions': np.array(actions, np.uint8),
+      'checksum_steps': np.array([k for k, _ in checksums], np.int64),
+      'checksums': np.array([v for _, v in checksums], np.uint32),
+      'snapshot_steps': np.array([k for k, _ in snapshots], np.int64),
+  }
+  for step, blob in snapshots:
+    arrays[f'snapshot_{step}'] = np.frombuffer(blob, np.uint8)
+  np.savez_compressed(filename, **arrays)
+
+
+def load(filename):
+  with np.load(filename, allow_pickle=False) as data:
+    return {
+        'config': json.loads(str(data['config'])),
+        'episode': int(data['episode']),
+        'actions': data['actions'],
+        'checksums': dict(zip(
+            data['checksum_steps'].tolist(), data['checksums'].tolist())),
+        'snapshots': {
+            step: data[f'snapshot_{step}'].tobytes()
+            for step in data['snapshot_steps'].tolist()},
+    }
+
+
+def replay(filename, outputs=('image',), size=None, start=0, stop=None,
+           verify=True):
+  """Re-simulate a recorded episode and yield one dict per step.
+
+  Each dict holds 'step', 'action' (the action that led to this step, None
+  at step 0), 'reward', 'done' and the requested outputs: 'image' rendered
+  at `size` (default: the recorded observation size), 'semantic' and
+  'info'. Steps before `start` are simulated without rendering, starting
+  from the closest stored snapshot. With `verify`, a mismatch against a
+  stored checksum raises RuntimeError.
+  """
+  unknown = set(outputs) - set(OUTPUTS)
+  if unknown:
+    raise ValueError(f'Unknown outputs: {sorted(unknown)}')
+  data = load(filename) if isinstance(filename, str) or hasattr(
+      filename, '__fspath__') else filename
+  actions = data['actions']
+  stop = len(actions) if stop is None else min(stop, len(actions))
+  env = _make_env(data)
+  step = 0
+  anchors = [k for k in data['snapshots'] if k <= start]
+  if anchors:
+    step = max(anchors)
+    env.set_state(data['snapshots'][step])
+  reward, done = 0.0, False
+  action = None
+  while step <= stop:
+    if verify and step in data['checksums']:
+      if env._checksum() != data['checksums'][step]:
+        raise RuntimeError(f'Replay diverged from the recording at step {step}.')
+    if step >= start:
+      yield _outputs(env, outputs, size, step, action, reward, done)
+    if step == stop:
+      break
+    action = int(actions[step])
+    reward, dead, over = env._advance_many(
+        (action,) * env._action_repeat)
+    done = bool(dead or over)
+    step += 1
+
+
+def render_video(filename, video, size=(512, 512), fps=30):
+  """Render a recorded episode to a video file."""
+  import imageio
+  with imageio.get_writer(str(video), fps=fps) as writer:
+    for frame in replay(filename, ('image',), size):
+      writer.append_data(frame['image'])
+
+
+def _make_env(data):
+  env = env_lib.Env(**data['config'])
+  env._episode = data['episode'] - 1
+  env.reset()
+  return env
+
+
+def _outputs(env, outputs, size, step, action, reward, done):
+  result = {'step': step, 'action': action, 'reward': reward, 'done': done}
+  if 'image' in outputs:
+    result['image'] = env.render(size)
+  if 'semantic' in outputs:
+    result['semantic'] = env._sem_view()
+  if 'info' in outputs:
+    result['info'] = env._info(reward, env._player.health <= 0)
+  return result
@@ -10,14 +10,18 @@ from PIL import Image
 
 from . import env as mini_crafter_env
 from . import constants
+from . import events
 
 
 def main():
   boolean = lambda x: bool(['False', 'True'].index(x))
   parser = argparse.ArgumentParser(description='Mini Crafter GUI - Play with keyboard controls')
   parser.add_argument('--seed', type=int, default=None)
-  parser.add_argument('--mode', type=str, default='mdp', choices=['mdp', 'pomdp'],
-                      help='MDP (9×9 world, fully observable) or POMDP (15×15 world, partially observable)')
+  parser.add_argument('--mode', type=str, default='mdp', choices=['mdp', 'pomdp', 'large'],
+                      help='MDP (9×9 world, fully observable), POMDP (15×15 world, partially observable) '
+                           'or large (--area world, partially observable)')
+  parser.add_argument('--area', type=int, nargs=2, default=(64, 64),
+                      help='World size for --mode large')
   parser.add_argument('--layout', type=str, default='default', choices=['default', 'full'],
                       help='Layout mode: default (9x7 world + inventory) or full (9x9 world + inventory)')
   parser.add_argument('--peaceful', type=boolean, default=True,
@@ -65,7 +69,7 @@ def main():
   constants.items['health']['initial'] = args.health
 
   # Configure Mini Crafter environment
-  world_size = "9×9" if args.mode == 'mdp' else "15×15"
+  world_size = {'mdp': "9×9", 'pomdp': "15×15"}.get(args.mode, f"{args.area[0]}×{args.area[1]}")
   observability = "fully observable" if args.mode == 'mdp' else "partially observable"
   
   print(f"Starting Mini Crafter:")
@@ -86,6 +90,8 @@ def main():
       'seed': args.seed,
       'worldgen_module': args.worldgen
   }
+  if args.mode == 'large':
+      env_kwargs['area'] = tuple(args.area)
   
   if args.length is not None:
       env_kwargs['length'] = args.length
@@ -148,13 +154,12 @@ def main():
     duration += 1
 
     # Achievements.
-    unlocked = {
-        name for name, count in env.unwrapped._player.achievements.items()
-        if count > 0 and name not in achievements}
-    for name in unlocked:
-      achievements |= unlocked
-      total = len(env.unwrapped._player.achievements.keys())
-      print(f'Achievement ({len(achievements)}/{total}): {name}')
+    for event in env.unwrapped.events:
+      if isinstance(event, events.Achievement) and (
+          event.name not in achievements):
+        achievements.add(event.name)
+        total = len(env.unwrapped._player.achievements)
+        print(f'Achievement ({len(achievements)}/{total}): {event.name}')
     if env.unwrapped._step > 0 and env.unwrapped._step % 100 == 0:
       print(f'Time step: {env.unwrapped._step}')
     if reward:
@@ -0,0 +1,185 @@
+"""Flat snapshots of the simulation state for planning and tree search.
+
+Env.get_state() packs everything that decides how the episode continues
+into one uint8 array, and Env.set_state() rebuilds the world from it in
+place. Textures, views and caches are left alone, so snapshots are a few
+kilobytes and restoring one takes microseconds. The buffer is laid out as
+
+  magic     8 bytes        MCSTATE2
+  header    uint64 (10,)   area, slots, objects, chunks, step, episode,
+                           unlocked achievements, world hash, render seed
+  floats    float64 (F,)   daylight, last health, player
+  rng       uint32 (625,)  MT19937 key and position of the world RNG
+  chunks    int32 (C, 5)   chunk bounds and number of members, in order
+  objects   int32 (N, 7)   slot, class, x, y, health and two extra fields
+  materials uint8 (W, H)   material map
+
+Objects are listed chunk by chunk in membership order, so restoring them
+in sequence reproduces the iteration order that creature balancing sees.
+The world RNG is stored as the key and position of its MT19937 state,
+through the public RandomState.get_state() and set_state(). The normal
+variate that RandomState caches is dropped, since the simulation never
+draws one. Night noise is seeded by the render seed and the step, so a
+restored state renders the same frames as the original.
+"""
+
+import numpy as np
+
+from . import constants
+from . import objects
+
+MAGIC = b'MCSTATE2'
+CLASSES = (
+    objects.Player, objects.Zombie, objects.Skeleton, objects.Arrow,
+    objects.Plant, objects.Fence)
+HEADER = 10
+COLUMNS = 7
+PLAYER = (
+    '_last_health', '_hunger', '_thirst', '_fatigue', '_recover', 'sleeping')
+
+
+def save(env):
+  world, player = env._world, env._player
+  codes = {cls: i for i, cls in enumerate(CLASSES)}
+  slots = {obj: i for i, obj in enumerate(world._objects) if obj}
+  chunks, rows = [], []
+  for key, members in world._chunks.items():
+    chunks.append(key + (len(members),))
+    for obj in members:
+      code = codes.get(type(obj))
+      if code is None:
+        raise ValueError(
+            f'Cannot snapshot objects of type {type(obj).__name__}.')
+      x, y = obj.pos.tolist()
+      rows.append(
+          (slots[obj], code, x, y, obj.inventory['health']) + _extra(obj))
+  unlocked = sum(
+      1 << i for i, name in enumerate(constants.achievements)
+      if name in env._unlocked)
+  header = np.array([
+      world.area[0], world.area[1], len(world._objects), len(rows),
+      len(chunks), env._step, env._episode, unlocked, world.hash,
+      world.render_seed],
+      np.uint64)
+  floats = np.array(
+      [world.daylight, env._last_health] +
+      list(player.facing) + [constants.actions.index(player.action)] +
+      [getattr(player, name) for name in PLAYER] +
+      list(player.inventory.values()) + list(player.achievements.values()),
+      np.float64)
+  return np.concatenate([
+      np.frombuffer(MAGIC, np.uint8),
+      header.view(np.uint8),
+      floats.view(np.uint8),
+      _rng_words(world.random).view(np.uint8),
+      np.array(chunks, np.int32).reshape((-1, 5)).view(np.uint8).ravel(),
+      np.array(rows, np.int32).reshape((-1, COLUMNS)).view(
+          np.uint8).ravel(),
+      world._mat_map.ravel()])
+
+
+def load(env, state):
+  buffer = np.frombuffer(state, np.uint8)
+  world = env._world
+  if buffer[:8].tobytes() != MAGIC:
+    raise ValueError('Not a state from Env.get_state().')
+  header = buffer[8: 8 + 8 * HEADER].view(np.uint64).tolist()
+  area, slots, count, num_chunks = header[:2], header[2], header[3], header[4]
+  if tuple(area) != tuple(world.area):
+    raise ValueError(
+        f'State of a {area[0]}x{area[1]} world cannot be restored into a '
+        f'{world.area[0]}x{world.area[1]} world.')
+  offset = 8 + 8 * HEADER
+  num_floats = 5 + len(PLAYER) + len(constants.items) + len(
+      constants.achievements)
+  floats = buffer[offset: offset + 8 * num_floats].view(np.float64).tolist()
+  offset += 8 * num_floats
+  rng = buffer[offset: offset + 4 * 625].view(np.uint32)
+  offset += 4 * 625
+  chunks = buffer[offset: offset + 20 * num_chunks].view(np.int32).reshape(
+      (num_chunks, 5)).tolist()
+  offset += 20 * num_chunks
+  rows = buffer[offset: offset + 4 * COLUMNS * count].view(np.int32).reshape(
+      (count, COLUMNS))
+  offset += 4 * COLUMNS * count
+  np.copyto(world._mat_map, buffer[offset:].reshape(world._mat_map.shape))
+
+  world.random.set_state(('MT19937', rng[:624], int(rng[624])))
+  world.daylight = floats[0]
+  world.events = []
+  world._hash = header[8]
+  world.render_seed = header[9]
+  world._obj_map[:] = 0
+  world._obj_map[rows[:, 2], rows[:, 3]] = rows[:, 0]
+  world._objects = [None] * slots
+  world._chunks.clear()
+  player = None
+  mobs = []
+  records, begin = rows.tolist(), 0
+  for xmin, xmax, ymin, ymax, size in chunks:
+    chunk = world._chunks[(xmin, xmax, ymin, ymax)]
+    begin, members = begin + size, records[begin: begin + size]
+    for slot, code, x, y, health, a, b in members:
+      cls = CLASSES[code]
+      obj = cls.__new__(cls)
+      obj.world = world
+      obj.pos = np.array((x, y))
+      obj.random = world.random
+      obj.inventory = {'health': health}
+      obj.removed = False
+      if cls is objects.Player:
+        player = obj
+      elif cls is objects.Zombie:
+        obj.cooldown = a
+        mobs.append(obj)
+      elif cls is objects.Skeleton:
+        obj.reload = a
+        mobs.append(obj)
+      elif cls is objects.Arrow:
+        obj.facing = np.array((a, b))
+      elif cls is objects.Plant:
+        obj.grown = a
+      world._objects[slot] = obj
+      chunk[obj] = None
+  for obj in mobs:
+    obj.player = player
+
+  player.facing = (int(floats[2]), int(floats[3]))
+  player.action = constants.actions[int(floats[4])]
+  for name, value in zip(PLAYER, floats[5:]):
+    setattr(player, name, bool(value) if name == 'sleeping' else _number(value))
+  start = 5 + len(PLAYER)
+  stop = start + len(constants.items)
+  player.inventory = objects.Inventory(
+      zip(constants.items, map(int, floats[start:stop])))
+  player.achievements = dict(
+      zip(constants.achievements, map(int, floats[stop:])))
+  env._player = player
+  env._step, env._episode = header[5], header[6]
+  env._last_health = _number(floats[1])
+  env._unlocked = {
+      name for i, name in enumerate(constants.achievements)
+      if header[7] >> i & 1}
+
+
+def _rng_words(random):
+  # The 624 key words of the MT19937 state followed by its position.
+  _, key, pos = random.get_state()[:3]
+  return np.append(key.astype(np.uint32), np.uint32(pos))
+
+
+def _extra(obj):
+  if isinstance(obj, objects.Zombie):
+    return (obj.cooldown, 0)
+  if isinstance(obj, objects.Skeleton):
+    return (obj.reload, 0)
+  if isinstance(obj, objects.Arrow):
+    return (obj.facing[0], obj.facing[1])
+  if isinstance(obj, objects.Plant):
+    return (obj.grown, 0)
+  return (0, 0)
+
+
+def _number(value):
+  # Health and life stat counters are stored as floats but are usually ints.
+  return int(value) if value.is_integer() else value
@@ -0,0 +1,165 @@
+"""Per-worker episode statistics and the aggregated Crafter score.
+
+Every writer owns its files, so many actors can record into one directory:
+
+  stats-<worker>.jsonl   one JSON line per episode, as before
+  stats-<worker>.bin     the same values as float32 rows after a small header
+
+Writers can buffer episodes and append them in batches; whatever is still
+buffered is written when the writer is garbage collected or the interpreter
+exits, even without close(). The reader memory-maps
+the binary sidecars, falls back to parsing JSONL files that have none (such
+as a legacy stats.jsonl), and computes success rates and the score over all
+episodes with array operations.
+"""
+
+import json
+import os
+import pathlib
+import socket
+import struct
+import time
+import uuid
+import weakref
+
+import numpy as np
+
+MAGIC = b'MCSTATS1'
+
+
+class Writer:
+
+  def __init__(self, directory, worker=None, flush_every=100, flush_secs=30):
+    self._directory = pathlib.Path(directory).expanduser()
+    self._directory.mkdir(exist_ok=True, parents=True)
+    worker = worker or '{}-{}-{}'.format(
+        socket.gethostname(), os.getpid(), uuid.uuid4().hex[:6])
+    self._jsonl = self._directory / f'stats-{worker}.jsonl'
+    self._binary = self._directory / f'stats-{worker}.bin'
+    self._flush_every = flush_every
+    self._flush_secs = flush_secs
+    self._columns = None
+    self._buffer = []
+    self._last_flush = time.time()
+    # Holds the buffer but not the writer, so it does not keep it alive.
+    self._finalizer = weakref.finalize(
+        self, _append, self._jsonl, self._binary, self._buffer)
+
+  def add(self, stats):
+    self._buffer.append(stats)
+    if (len(self._buffer) >= self._flush_every or
+        time.time() - self._last_flush >= self._flush_secs):
+      self.flush()
+
+  def flush(self):
+    self._last_flush = time.time()
+    self._columns = _append(
+        self._jsonl, self._binary, self._buffer, self._columns)
+
+  def close(self):
+    self.flush()
+    self._finalizer.detach()
+
+
+def load(directory):
+  """Columns of all episodes in the directory, as a dict of 1D arrays."""
+  directory = pathlib.Path(directory).expanduser()
+  parts = []
+  for filename in sorted(directory.glob('*.bin')):
+    part = _load_binary(filename)
+    if part is not None:
+      parts.append(part)
+  covered = {filename.with_suffix('.jsonl') for filename in directory.glob(
+      '*.bin')}
+  for filename in sorted(directory.glob('*.jsonl')):
+    if filename not in covered:
+      parts.append(_load_jsonl(filename))
+  keys = []
+  for part in parts:
+    keys += [key for key in part if key not in keys]
+  return {
+      key: np.concatenate([
+          part[key] if key in part else
+          np.full(len(next(iter(part.values()))), np.nan, np.float32)
+          for part in parts])
+      for key in keys}
+
+
+def success_rates(columns):
+  """Percentage of episodes that unlocked each achievement at least once."""
+  return {
+      key[len('achievement_'):]: 100 * float(np.mean(values >= 1))
+      for key, values in columns.items()
+      if key.startswith('achievement_') and len(values)}
+
+
+def score(columns):
+  """Geometric mean of the success rates, shifted by one as in Crafter."""
+  rates = np.array(list(success_rates(columns).values()))
+  if not len(rates):
+    return float('nan')
+  return float(np.exp(np.mean(np.log(1 + rates))) - 1)
+
+
+def _append(jsonl, binary, buffer, columns=None):
+  # Writes and empties the buffer in place; returns the binary columns.
+  if not buffer:
+    return columns
+  episodes = buffer[:]
+  buffer.clear()
+  with jsonl.open('a') as f:
+    f.write(''.join(json.dumps(stats) + '\n' for stats in episodes))
+  if columns is None and binary.exists():
+    columns = _read_header(binary)[0]
+  if columns is None:
+    columns = list(episodes[0].keys())
+    with binary.open('wb') as f:
+      f.write(_header(columns))
+  rows = np.array([
+      [stats.get(key, np.nan) for key in columns]
+      for stats in episodes], np.float32)
+  with binary.open('ab') as f:
+    f.write(rows.tobytes())
+  return columns
+
+
+def _header(columns):
+  meta = json.dumps({'columns': columns, 'dtype': '<f4'}).encode()
+  size = len(MAGIC) + 4 + len(meta)
+  meta += b' ' * (-size % 64)
+  return MAGIC + struct.pack('<I', len(meta)) + meta
+
+
+def _read_header(filename):
+  with filename.open('rb') as f:
+    head = f.read(len(MAGIC) + 4)
+    if len(head) < len(MAGIC) + 4 or head[:len(MAGIC)] != MAGIC:
+      return None
+    length, = struct.unpack('<I', head[len(MAGIC):])
+    meta = json.loads(f.read(length))
+  return meta['columns'], np.dtype(meta['dtype']), len(MAGIC) + 4 + length
+
+
+def _load_binary(filename):
+  header = _read_header(filename)
+  if header is None:
+    return None
+  columns, dtype, offset = header
+  # A writer that was killed mid-batch may leave a partial last row.
+  rows = (filename.stat().st_size - offset) // (dtype.itemsize * len(columns))
+  if not rows:
+    return {key: np.zeros(0, dtype) for key in columns}
+  data = np.memmap(
+      filename, dtype, 'r', offset, shape=(rows, len(columns)))
+  return {key: data[:, index] for index, key in enumerate(columns)}
+
+
+def _load_jsonl(filename):
+  lines = [json.loads(line) for line in filename.read_text().splitlines()
+           if line.strip()]
+  keys = []
+  for line in lines:
+    keys += [key for key in line if key not in keys]
+  return {
+      key: np.array([line.get(key, np.nan) for line in lines], np.float32)
+      for key in keys}
@@ -1,4 +1,8 @@
 import collections
+import concurrent.futures
+import os
+import time
+
 import numpy as np
 
 from . import constants
@@ -21,22 +25,171 @@ T_WATER, T_GRASS, T_STONE, T_SAND = 1, 2, 3, 4
 O_NONE, O_TREE, O_COW, O_ZOMBIE, O_SKELETON, O_COAL, O_IRON, O_DIAMOND = 0, 1, 2, 3, 4, 5, 6, 7
 
 
+PHASES = ('blob_growth', 'smoothing', 'sand', 'overlay', 'acceptance', 'apply')
+
+
 def generate_world(world, player, peaceful=False):
-    rng = world.random
+    """
+    Generate and apply a layout. Returns the telemetry of this call:
+    {'attempts', 'rejections': {reason: count}, 'time': {phase: seconds}},
+    which is also folded into the process-wide TELEMETRY aggregate.
+    """
+    grid, overlay, stats = _generate_layout(world.area, world.random, peaceful, player.pos)
+    start = time.perf_counter()
+    _apply_layout(world, player, grid, overlay, peaceful)
+    stats['time']['apply'] = time.perf_counter() - start
+    stats['time']['total'] = sum(stats['time'].values())
+    TELEMETRY.record(world.area, stats)
+    return stats
+
+
+def generate_layouts(seeds, area, peaceful=False, processes=1, chunksize=64):
+    """
+    Generate one layout per seed without a live World or Player.
+    Each seed drives its own np.random.RandomState, so a seed produces the same
+    layout as Env.reset for the world seed it derives. The spawn is the map
+    center, as in Env.reset.
+    Returns (grids, overlays, attempts): stacked (N, W, H) uint8 arrays using
+    the T_* / O_* codes and the (N,) number of candidates tried per seed.
+    With processes > 1 (or None for one per CPU), chunks of `chunksize` seeds
+    are fanned out over a process pool; results keep the order of `seeds`.
+    """
+    seeds = np.asarray(seeds, dtype=np.int64).reshape(-1)
+    area = (int(area[0]), int(area[1]))
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes <= 1 or len(seeds) <= chunksize:
+        return _generate_chunk(seeds, area, peaceful)
+    chunks = [seeds[i: i + chunksize] for i in range(0, len(seeds), chunksize)]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as pool:
+        results = list(pool.map(
+            _generate_chunk, chunks, [area] * len(chunks), [peaceful] * len(chunks)))
+    grids, overlays, attempts = zip(*results)
+    return np.concatenate(grids), np.concatenate(overlays), np.concatenate(attempts)
+
+
+def _generate_chunk(seeds, area, peaceful):
+    spawn = (area[0] // 2, area[1] // 2)
+    grids = np.zeros((len(seeds),) + area, dtype=np.uint8)
+    overlays = np.zeros((len(seeds),) + area, dtype=np.uint8)
+    attempts = np.zeros(len(seeds), dtype=np.int32)
+    for i, seed in enumerate(seeds):
+        rng = np.random.RandomState(int(seed))
+        grids[i], overlays[i], stats = _generate_layout(area, rng, peaceful, spawn)
+        attempts[i] = stats['attempts']
+    return grids, overlays, attempts
+
+
+def _generate_layout(world_area, rng, peaceful, spawn):
+    """Rejection loop: returns the first accepted (grid, overlay) and its telemetry."""
+    timings = dict.fromkeys(PHASES, 0.0)
+    rejections = collections.Counter()
     attempt = 0
     while True:
         attempt += 1
-        grid, overlay = _generate_candidate(world.area, rng, peaceful, attempt, player.pos)
+        grid, overlay = _generate_candidate(world_area, rng, peaceful, attempt, spawn, timings)
         if grid is None:
+            rejections[overlay] += 1
             continue
-        if _meets_minima_effective(grid, overlay, peaceful) and _spawn_open_enough(grid, overlay, world.area, player.pos, rng):
-            _apply_layout(world, player, grid, overlay, peaceful)
-            return
+        start = time.perf_counter()
+        if not _meets_minima_effective(grid, overlay, peaceful):
+            reason = 'effective_minima'
+        elif not _spawn_open_enough(grid, overlay, world_area, spawn, rng):
+            reason = 'spawn_blocked'
+        else:
+            reason = None
+        timings['acceptance'] += time.perf_counter() - start
+        if reason is None:
+            stats = {'attempts': attempt, 'rejections': dict(rejections), 'time': timings}
+            return grid, overlay, stats
+        rejections[reason] += 1
+
 
-def _generate_candidate(world_area, rng, peaceful, attempt, spawn):
+class Telemetry:
+    """
+    Process-wide aggregate of generate_world telemetry, keyed by map area.
+    Per area it counts resets, attempts and rejection reasons, and keeps
+    log2-spaced histograms of attempts per reset and of time per phase.
+    """
+
+    # Histogram bucket i counts times below TIME_EDGES[i] seconds (last: above)
+    TIME_EDGES = tuple(2.0 ** e for e in range(-16, 3))
+    ATTEMPT_EDGES = (2, 3, 5, 9, 17, 33, 65)
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._areas = {}
+
+    def record(self, area, stats):
+        entry = self._areas.get(tuple(area))
+        if entry is None:
+            entry = self._areas[tuple(area)] = {
+                'resets': 0,
+                'attempts': 0,
+                'max_attempts': 0,
+                'rejections': collections.Counter(),
+                'attempt_hist': [0] * (len(self.ATTEMPT_EDGES) + 1),
+                'time': collections.Counter(),
+                'time_hist': collections.defaultdict(
+                    lambda: [0] * (len(self.TIME_EDGES) + 1)),
+            }
+        attempts = stats['attempts']
+        entry['resets'] += 1
+        entry['attempts'] += attempts
+        entry['max_attempts'] = max(entry['max_attempts'], attempts)
+        entry['rejections'].update(stats['rejections'])
+        entry['attempt_hist'][_bucket(attempts, self.ATTEMPT_EDGES)] += 1
+        for phase, seconds in stats['time'].items():
+            entry['time'][phase] += seconds
+            entry['time_hist'][phase][_bucket(seconds, self.TIME_EDGES)] += 1
+
+    def report(self):
+        """Plain-dict summary per 'WxH' area, safe to dump as JSON."""
+        report = {}
+        for (w, h), entry in self._areas.items():
+            resets = entry['resets']
+            report[f'{w}x{h}'] = {
+                'resets': resets,
+                'mean_attempts': entry['attempts'] / resets,
+                'max_attempts': entry['max_attempts'],
+                'rejections': dict(entry['rejections'].most_common()),
+                'attempt_hist': {
+                    'edges': list(self.ATTEMPT_EDGES),
+                    'counts': list(entry['attempt_hist'])},
+                'mean_time': {
+                    phase: seconds / resets
+                    for phase, seconds in entry['time'].items()},
+                'time_hist': {
+                    'edges': list(self.TIME_EDGES),
+                    'counts': {
+                        phase: list(counts)
+                        for phase, counts in entry['time_hist'].items()}},
+            }
+        return report
+
+
+TELEMETRY = Telemetry()
+
+
+def telemetry_report():
+    return TELEMETRY.report()
+
+
+def _bucket(value, edges):
+    for i, edge in enumerate(edges):
+        if value < edge:
+            return i
+    return len(edges)
+
+
+def _generate_candidate(world_area, rng, peaceful, attempt, spawn, timings):
+    """Returns (grid, overlay), or (None, reason) when the candidate is rejected."""
     W, H = world_area
     A = W * H
     sx, sy = int(spawn[0]), int(spawn[1])
+    start = time.perf_counter()
 
     grid = np.zeros(world_area, dtype=np.uint8)
     overlay = np.zeros(world_area, dtype=np.uint8)
@@ -53,42 +206,35 @@ def _generate_candidate(world_area, rng, peaceful, attempt, spawn):
     water_target += min(attempt // 15, 2)
     stone_target += min(attempt // 10, 3)
 
-    any_cell  = lambda p: True
-    not_water = lambda p: grid[p] != T_WATER
-
-    max_water_blobs = 1 if A <= 100 else 2
-    max_stone_blobs = 1 if A <= 100 else 2
+    # Large maps get more, not bigger, blobs: about one per 32x32 block
+    max_water_blobs = 1 if A <= 100 else max(2, A // 1024)
+    max_stone_blobs = 1 if A <= 100 else max(2, A // 1024)
 
-    w_cells = _multi_blob_growth(grid, world_area, rng, any_cell, water_target, max_water_blobs)
-    for x, y in w_cells:
-        grid[x, y] = T_WATER
+    w_cells = _multi_blob_growth(np.ones(world_area, dtype=bool), rng, water_target, max_water_blobs)
+    grid[w_cells] = T_WATER
 
-    s_cells = _multi_blob_growth(grid, world_area, rng, not_water, stone_target, max_stone_blobs)
-    for x, y in s_cells:
-        grid[x, y] = T_STONE
+    s_cells = _multi_blob_growth(grid != T_WATER, rng, stone_target, max_stone_blobs)
+    grid[s_cells] = T_STONE
 
     # Fill remainder with grass
-    for x in range(W):
-        for y in range(H):
-            if grid[x, y] == 0:
-                grid[x, y] = T_GRASS
+    grid[grid == 0] = T_GRASS
+    start = _lap(timings, 'blob_growth', start)
 
     # One smoothing pass for organic shapes
     grid = _majority_smooth(grid, world_area)
+    start = _lap(timings, 'smoothing', start)
 
     # ---- 2) Sand fringe near water (simple) ----
     sand_target = 2 if A <= 100 else 3
-    water_adj_grass = []
-    for x in range(W):
-        for y in range(H):
-            if grid[x, y] == T_GRASS and _is_adj(x, y, T_WATER, grid, world_area):
-                water_adj_grass.append((x, y))
+    water_adj = _dilate8(grid == T_WATER)
+    water_adj_grass = [(int(x), int(y)) for x, y in np.argwhere((grid == T_GRASS) & water_adj)]
     if water_adj_grass:
         rng.shuffle(water_adj_grass)
-        seed = water_adj_grass[0]
-        sand_cells = _bfs_grow(seed, lambda p: grid[p] == T_GRASS, sand_target + rng.randint(0, 2), world_area, rng)
-        for x, y in sand_cells:
-            grid[x, y] = T_SAND
+        # Large maps get one fringe patch per 15x15 block of area
+        patches = 1 if A <= 1024 else min(len(water_adj_grass), A // 225)
+        for seed in water_adj_grass[:patches]:
+            sand_cells = _frontier_grow(seed, grid == T_GRASS, sand_target + rng.randint(0, 2), rng)
+            grid[sand_cells] = T_SAND
     else:
         # fallback: sprinkle a couple of sand tiles if no grass touches water
         grass_plots = np.argwhere(grid == T_GRASS)
@@ -100,13 +246,14 @@ def _generate_candidate(world_area, rng, peaceful, attempt, spawn):
     # ---- 2.5) Reserve the spawn tile (grass + no overlays) BEFORE capacities ----
     grid[sx, sy] = T_GRASS
     overlay[sx, sy] = O_NONE
+    start = _lap(timings, 'sand', start)
 
     # Quick structural feasibility of base minima *before* baking
     if ((_count(grid, T_GRASS) < MIN['grass']) or
         (_count(grid, T_STONE) < MIN['stone']) or
         (_count(grid, T_WATER) < MIN['water']) or
         (_count(grid, T_SAND)  < MIN['sand'])):
-        return None, None
+        return _reject(timings, start, 'base_minima')
 
     # ---- 3) Capacity-aware overlays (do not consume reserved base minima) ----
     grass_total = _count(grid, T_GRASS)
@@ -121,7 +268,7 @@ def _generate_candidate(world_area, rng, peaceful, attempt, spawn):
     # If we cannot put at least the MIN ores into stone without breaking MIN['stone'], abort early
     min_ore_total = MIN['coal'] + MIN['iron'] + MIN['diamond']
     if stone_cap_for_ores < min_ore_total:
-        return None, None
+        return _reject(timings, start, 'ore_capacity')
 
     # --- Size-scaled randomness so bigger maps tend to spawn > minima ---
     # 9x7=63, 9x9=81, 15x15=225. area_scale in [0, ~1] for common sizes.
@@ -143,6 +290,8 @@ def _generate_candidate(world_area, rng, peaceful, attempt, spawn):
         extra_d += 1
     if A >= 256 and rng.random() < 0.15:  # 16x16+
         extra_d += 1
+    if A > 1024:  # 32x32+: keep diamond density of a 15x15 map
+        extra_d += rng.binomial(A // 225, 0.25)
     diam_k = max(1, MIN['diamond'] + extra_d)
 
     # Clamp ore totals to stone capacity (while keeping minima)
@@ -153,7 +302,7 @@ def _generate_candidate(world_area, rng, peaceful, attempt, spawn):
 
     # After clamping, ensure we still meet minima (safe because rem_cap started >= min_ore_total)
     if coal_k < MIN['coal'] or iron_k < MIN['iron'] or diam_k < MIN['diamond']:
-        return None, None
+        return _reject(timings, start, 'ore_minima')
 
     # Trees can bake on grass or sand; respect each capacity so post-bake grass/sand minima hold.
     # First try to satisfy trees from grass; only then dip into sand.
@@ -164,38 +313,41 @@ def _generate_candidate(world_area, rng, peaceful, attempt, spawn):
 
     # Ensure we can at least place MIN['wood']
     if (wood_from_grass + wood_from_sand) < MIN['wood']:
-        return None, None
+        return _reject(timings, start, 'wood_capacity')
 
     # Candidates (lists are mutated by _place_k). EXCLUDE spawn from all candidates.
-    grass_free = [(int(i), int(j)) for (i, j) in np.argwhere((grid == T_GRASS) & (overlay == O_NONE))]
-    sand_free  = [(int(i), int(j)) for (i, j) in np.argwhere((grid == T_SAND)  & (overlay == O_NONE))]
-    stone_free = [(int(i), int(j)) for (i, j) in np.argwhere((grid == T_STONE) & (overlay == O_NONE))]
-    grass_free = [(x, y) for (x, y) in grass_free if not (x == sx and y == sy)]
-    sand_free  = [(x, y) for (x, y) in sand_free  if not (x == sx and y == sy)]
-    stone_free = [(x, y) for (x, y) in stone_free if not (x == sx and y == sy)]
+    free = overlay == O_NONE
+    free[sx, sy] = False
+    grass_free = np.argwhere((grid == T_GRASS) & free).tolist()
+    sand_free  = np.argwhere((grid == T_SAND)  & free).tolist()
+    stone_free = np.argwhere((grid == T_STONE) & free).tolist()
     walk_free  = list(grass_free) + list(sand_free)
 
     rng.shuffle(grass_free); rng.shuffle(sand_free); rng.shuffle(stone_free); rng.shuffle(walk_free)
 
     # Place trees in two phases to respect the per-base capacities
     if wood_from_grass:
-        if not _place_k(overlay, O_TREE, wood_from_grass, [grass_free], rng): return None, None
+        if not _place_k(overlay, O_TREE, wood_from_grass, [grass_free], rng): return _reject(timings, start, 'place_trees')
     if wood_from_sand:
-        if not _place_k(overlay, O_TREE, wood_from_sand,  [sand_free],  rng): return None, None
+        if not _place_k(overlay, O_TREE, wood_from_sand,  [sand_free],  rng): return _reject(timings, start, 'place_trees')
 
     # Ores on stone (stone_free is shrinking as we place)
-    if not _place_k(overlay, O_COAL,   coal_k, [stone_free], rng):   return None, None
-    if not _place_k(overlay, O_IRON,   iron_k, [stone_free], rng):   return None, None
-    if not _place_k(overlay, O_DIAMOND, diam_k, [stone_free], rng):  return None, None
+    if not _place_k(overlay, O_COAL,   coal_k, [stone_free], rng):   return _reject(timings, start, 'place_ores')
+    if not _place_k(overlay, O_IRON,   iron_k, [stone_free], rng):   return _reject(timings, start, 'place_ores')
+    if not _place_k(overlay, O_DIAMOND, diam_k, [stone_free], rng):  return _reject(timings, start, 'place_ores')
 
     # Mobs (do not affect post-bake material counts)
     if not peaceful:
         zomb_k = max(MIN['zombie'], 1 + (1 if (A >= 200 and rng.random() < 0.35) else 0))
         skel_k = max(MIN['skeleton'], 1 + (1 if (A >= 200 and rng.random() < 0.35) else 0))
-        if not _place_k(overlay, O_ZOMBIE,   zomb_k, [walk_free],  rng): return None, None
-        if not _place_k(overlay, O_SKELETON, skel_k, [stone_free], rng): return None, None
+        if A > 1024:  # 32x32+: keep mob density of a 15x15 map
+            zomb_k *= A // 225
+            skel_k *= A // 225
+        if not _place_k(overlay, O_ZOMBIE,   zomb_k, [walk_free],  rng): return _reject(timings, start, 'place_mobs')
+        if not _place_k(overlay, O_SKELETON, skel_k, [stone_free], rng): return _reject(timings, start, 'place_mobs')
 
     # Final spawn reachability is checked by the caller (_spawn_open_enough)
+    _lap(timings, 'overlay', start)
     return grid, overlay
 
 
@@ -236,39 +388,49 @@ def _spawn_open_enough(grid, overlay, world_area, spawn, rng):
       - base in {GRASS, SAND} AND overlay is not a TREE (trees bake to non-walkable)
     Conditions:
       1) At least one orthogonal neighbor of spawn is walkable
-      2) BFS from spawn over walkable tiles reaches at least:
+      2) A flood fill from spawn over walkable tiles reaches at least:
          max(6, 25% of all walkable tiles)
     """
     sx, sy = int(spawn[0]), int(spawn[1])
     W, H = world_area
 
-    def is_walkable(pos):
-        return ((grid[pos] == T_GRASS or grid[pos] == T_SAND) and overlay[pos] != O_TREE)
+    walkable = ((grid == T_GRASS) | (grid == T_SAND)) & (overlay != O_TREE)
 
     # 1) Check for at least one open orthogonal neighbor
     dirs = [(-1, 0), (1, 0), (0, -1), (0, 1)]
     has_exit = False
     for dx, dy in dirs:
         nx, ny = sx + dx, sy + dy
-        if 0 <= nx < W and 0 <= ny < H and is_walkable((nx, ny)):
+        if 0 <= nx < W and 0 <= ny < H and walkable[nx, ny]:
             has_exit = True
             break
     if not has_exit:
         return False
 
-    # 2) BFS reachability on walkable tiles
-    reachable = _bfs_grow((sx, sy), lambda p: is_walkable(p), W * H, world_area, rng)
-    walkable_total = int(np.sum(((grid == T_GRASS) | (grid == T_SAND)) & (overlay != O_TREE)))
+    # 2) Flood-fill reachability on walkable tiles
+    reachable = _frontier_grow((sx, sy), walkable, W * H, rng)
+    walkable_total = int(walkable.sum())
 
     if walkable_total <= 1:
         return False
 
     min_reachable = max(6, int(0.25 * walkable_total))
-    return len(reachable) >= min_reachable
+    return int(reachable.sum()) >= min_reachable
 
 
 # --- Helpers ---
 
+def _lap(timings, phase, start):
+    now = time.perf_counter()
+    timings[phase] += now - start
+    return now
+
+
+def _reject(timings, start, reason):
+    _lap(timings, 'overlay', start)
+    return None, reason
+
+
 def _place_k(overlay, overlay_type, k, cand_lists, rng):
     """Try to place exactly k items using the provided candidate lists (in order)."""
     for _ in range(k):
@@ -289,56 +451,104 @@ def _place_k(overlay, overlay_type, k, cand_lists, rng):
     return True
 
 
-def _bfs_grow(start_node, allowed_check, max_size, world_area, rng):
-    q = collections.deque([start_node])
-    visited = {start_node}
-    while q and len(visited) < max_size:
-        x, y = q.popleft()
-        neighbors = [(x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)]
-        rng.shuffle(neighbors)
-        for nx, ny in neighbors:
-            p = (nx, ny)
-            if p in visited or not (0 <= nx < world_area[0] and 0 <= ny < world_area[1]):
-                continue
-            if allowed_check(p):
-                visited.add(p)
-                q.append(p)
-    return visited
+def _frontier_grow(start_node, allowed, max_size, rng):
+    """
+    Grow a 4-connected region from start_node over the boolean mask `allowed`.
+    The region expands one ring at a time: each ring is every allowed, unvisited
+    neighbor of the previous ring, so the cost scales with the number of rings
+    rather than the number of cells. The ring that crosses max_size is admitted
+    parent by parent in random order until the budget is reached, which keeps
+    the BFS budget semantics (the last expanded cell may overshoot by up to 3).
+    Returns a boolean mask of the grown cells (start_node included).
+    """
+    W, H = allowed.shape
+    grown = np.zeros(allowed.shape, dtype=bool)
+    grown[start_node] = True
+    frontier = grown.copy()
+    # Work inside the frontier's bounding box grown by one cell per ring
+    x0, y0 = int(start_node[0]), int(start_node[1])
+    x1, y1 = x0 + 1, y0 + 1
+    size = 1
+    while size < max_size:
+        x0, y0, x1, y1 = max(0, x0 - 1), max(0, y0 - 1), min(W, x1 + 1), min(H, y1 + 1)
+        win = (slice(x0, x1), slice(y0, y1))
+        ring = _dilate4(frontier[win]) & allowed[win] & ~grown[win]
+        xs, ys = np.nonzero(ring)
+        count = len(xs)
+        if count == 0:
+            break
+        if size + count > max_size:
+            _admit_partial_ring(grown[win], frontier[win], ring, size, max_size, rng)
+            break
+        grown[win] |= ring
+        frontier[win] = ring
+        x0, y0, x1, y1 = x0 + xs.min(), y0 + ys.min(), x0 + xs.max() + 1, y0 + ys.max() + 1
+        size += count
+    return grown
+
+
+def _admit_partial_ring(grown, frontier, ring, size, max_size, rng):
+    W, H = grown.shape
+    parents = np.argwhere(frontier)
+    for x, y in parents[rng.permutation(len(parents))]:
+        for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if 0 <= nx < W and 0 <= ny < H and ring[nx, ny] and not grown[nx, ny]:
+                grown[nx, ny] = True
+                size += 1
+        if size >= max_size:
+            return
+
+
+def _dilate4(mask):
+    out = mask.copy()
+    out[1:] |= mask[:-1]
+    out[:-1] |= mask[1:]
+    out[:, 1:] |= mask[:, :-1]
+    out[:, :-1] |= mask[:, 1:]
+    return out
 
 
 def _majority_smooth(grid, world_area):
-    new_grid = grid.copy()
-    for x in range(world_area[0]):
-        for y in range(world_area[1]):
-            counts = collections.defaultdict(int)
-            for dx in (-1, 0, 1):
-                for dy in (-1, 0, 1):
-                    nx, ny = x + dx, y + dy
-                    if 0 <= nx < world_area[0] and 0 <= ny < world_area[1]:
-                        counts[grid[nx, ny]] += 1
-            new_grid[x, y] = max(counts, key=counts.get)
-    return new_grid
-
-
-def _is_adj(x, y, tile_type, grid, world_area):
+    """
+    Replace every tile by the most common tile in its 3x3 neighborhood.
+    Ties go to the tile seen first when scanning the neighborhood column by
+    column from the top-left, as the original per-cell loop did.
+    """
+    W, H = world_area
+    tiles = np.array([T_WATER, T_GRASS, T_STONE, T_SAND], dtype=np.uint8)
+    padded = np.zeros((W + 2, H + 2), dtype=np.uint8)
+    padded[1:-1, 1:-1] = grid
+    counts = np.zeros((len(tiles), W, H), dtype=np.int32)
+    first = np.full((len(tiles), W, H), 9, dtype=np.int32)
+    index = 0
     for dx in (-1, 0, 1):
         for dy in (-1, 0, 1):
-            if dx == 0 and dy == 0:
-                continue
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < world_area[0] and 0 <= ny < world_area[1] and grid[nx, ny] == tile_type:
-                return True
-    return False
+            neighbor = padded[1 + dx: 1 + dx + W, 1 + dy: 1 + dy + H]
+            hit = neighbor[None] == tiles[:, None, None]
+            counts += hit
+            first[hit & (first == 9)] = index
+            index += 1
+    score = 16 * counts + (9 - first)
+    return tiles[score.argmax(0)]
+
+
+def _dilate8(mask):
+    out = _dilate4(mask)
+    out[1:, 1:] |= mask[:-1, :-1]
+    out[:-1, :-1] |= mask[1:, 1:]
+    out[1:, :-1] |= mask[:-1, 1:]
+    out[:-1, 1:] |= mask[1:, :-1]
+    return out
 
 
 def _count(grid, tile):
     return int((grid == tile).sum())
 
 
-def _multi_blob_growth(grid, world_area, rng, allowed_check, total_target, max_blobs):
+def _multi_blob_growth(allowed, rng, total_target, max_blobs):
     """
-    Grow 1..max_blobs BFS blobs that together reach total_target cells.
-    Returns the set of grown cells. Does not mutate grid.
+    Grow 1..max_blobs frontier blobs over the boolean mask `allowed` that
+    together reach total_target cells. Returns a boolean mask of grown cells.
     """
     blobs = 1 if max_blobs <= 1 else (1 + rng.randint(0, max_blobs))  # 1..max_blobs
     budgets = []
@@ -353,23 +563,22 @@ def _multi_blob_growth(grid, world_area, rng, allowed_check, total_target, max_b
             budgets.append(part)
             remaining -= part
 
-    grown = set()
+    grown = np.zeros(allowed.shape, dtype=bool)
     for b in budgets:
-        # pick a random seed that satisfies allowed_check
+        # pick a random seed inside the allowed mask
         tries = 0
         seed = None
         while tries <= 64:
-            sx = rng.randint(0, world_area[0])  # 0..W-1
-            sy = rng.randint(0, world_area[1])  # 0..H-1
+            sx = rng.randint(0, allowed.shape[0])  # 0..W-1
+            sy = rng.randint(0, allowed.shape[1])  # 0..H-1
             cand = (sx, sy)
-            if allowed_check(cand) and cand not in grown:
+            if allowed[cand] and not grown[cand]:
                 seed = cand
                 break
             tries += 1
         if seed is None:
             continue
-        used = _bfs_grow(seed, lambda p: allowed_check(p) and p not in grown, b, world_area, rng)
-        grown |= used
+        grown |= _frontier_grow(seed, allowed & ~grown, b, rng)
     return grown
 
 
@@ -389,12 +598,11 @@ def _apply_layout(world, player, grid, overlay, peaceful):
             world.remove(obj)
 
     # Write base + baked resources
-    for x in range(world.area[0]):
-        for y in range(world.area[1]):
-            pos = (x, y)
-            world[pos] = mat_map.get(grid[x, y], 'grass')
-            if overlay[x, y] in overlay_mats:
-                world[pos] = overlay_mats[overlay[x, y]]
+    world.paint(np.ones(world.area, dtype=bool), 'grass')
+    for tile, material in mat_map.items():
+        world.paint(grid == tile, material)
+    for tile, material in overlay_mats.items():
+        world.paint(overlay == tile, material)
 
     # Ensure safe spawn (should already be grass due to reservation)
     if world[player.pos][0] != 'grass':
@@ -402,13 +610,13 @@ def _apply_layout(world, player, grid, overlay, peaceful):
 
     # Spawn mobs
     if not peaceful:
-        for x in range(world.area[0]):
-            for y in range(world.area[1]):
-                pos = (x, y)
-                # Clear any existing non-player object first
-                if world[pos][1] and not isinstance(world[pos][1], objects.Player):
-                    world.remove(world[pos][1])
-                if overlay[x, y] == O_ZOMBIE:
-                    world.add(objects.Zombie(world, pos, player))
-                elif overlay[x, y] == O_SKELETON:
-                    world.add(objects.Skeleton(world, pos, player))
+        mobs = (overlay == O_ZOMBIE) | (overlay == O_SKELETON)
+        for x, y in np.argwhere(mobs):
+            pos = (int(x), int(y))
+            # Clear any existing non-player object first
+            if world[pos][1] and not isinstance(world[pos][1], objects.Player):
+                world.remove(world[pos][1])
+            if overlay[x, y] == O_ZOMBIE:
+                world.add(objects.Zombie(world, pos, player))
+            else:
+                world.add(objects.Skeleton(world, pos, player))
@@ -0,0 +1,39 @@
+from benchmarks import suite
+
+
+def _results(**results):
+  return {'meta': {}, 'results': results}
+
+
+def test_compare_flags_slower_and_faster_metrics():
+  before = _results(step={'steps_per_sec': 100.0, 'p50_ms': 10.0})
+  after = _results(step={'steps_per_sec': 80.0, 'p50_ms': 10.5})
+  rows = {row[1]: row for row in suite.compare(before, after, 0.1)}
+  assert rows['steps_per_sec'][-1]
+  assert not rows['p50_ms'][-1]
+
+
+def test_compare_flags_worldgen_attempts():
+  before = _results(reset={'attempts_mean': 1.0, 'attempts_max': 2})
+  after = _results(reset={'attempts_mean': 1.5, 'attempts_max': 2})
+  rows = {row[1]: row for row in suite.compare(before, after, 0.1)}
+  assert rows['attempts_mean'][-1]
+  assert not rows['attempts_max'][-1]
+
+
+def test_compare_reports_removed_and_new_benchmarks():
+  before = _results(
+      gone={'steps_per_sec': 1.0}, kept={'render_ms': 1.0, 'p99_ms': 2.0})
+  after = _results(kept={'render_ms': 1.0}, added={'steps_per_sec': 1.0})
+  rows = {(row[0], row[1]): row for row in suite.compare(before, after, 0.1)}
+  assert rows[('gone', 'steps_per_sec')][3:] == (None, None, True)
+  assert rows[('kept', 'p99_ms')][-1]
+  assert rows[('added', 'steps_per_sec')][2] is None
+  assert not rows[('added', 'steps_per_sec')][-1]
+
+
+def test_compare_handles_zero_baselines():
+  before = _results(video={'dropped_frames': 0})
+  after = _results(video={'dropped_frames': 3})
+  row, = suite.compare(before, after, 0.1)
+  assert row[-1]
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+import mini_crafter
+from mini_crafter import codec
+from mini_crafter import recorder
+
+
+def _encode(frames, tile, offset=(0, 0), keyframe_every=16):
+  encoder = codec.DeltaEncoder(tile, offset, keyframe_every)
+  parts = {}
+  for frame in frames:
+    for suffix, rows in encoder.encode(frame).items():
+      parts.setdefault(suffix, []).append(rows)
+  return {
+      f'x.{suffix}': np.concatenate(rows) for suffix, rows in parts.items()}
+
+
+@pytest.mark.parametrize('tile, offset', [((4, 4), (0, 0)), ((5, 3), (2, 1))])
+def test_round_trip_random_access(tile, offset):
+  rng = np.random.RandomState(0)
+  frames = [rng.randint(0, 256, (18, 22, 3)).astype(np.uint8)]
+  for _ in range(40):
+    frame = frames[-1].copy()
+    y, x = rng.randint(0, 16), rng.randint(0, 20)
+    frame[y: y + 3, x: x + 2] = rng.randint(0, 256, (3, 2, 3))
+    frames.append(frame)
+  decoded = codec.decode(_encode(frames, tile, offset, keyframe_every=7))['x']
+  assert decoded.shape == (41, 18, 22, 3)
+  for index in rng.permutation(41):
+    assert np.array_equal(decoded[index], frames[index])
+  assert np.array_equal(np.asarray(decoded), np.stack(frames))
+
+
+def test_recorded_delta_episode_matches_plain_episode(tmp_path):
+  episodes = {}
+  for name, kwargs in [('plain', {}), ('delta', {'codec': 'delta'})]:
+    directory = tmp_path / name
+    env = recorder.EpisodeRecorder(
+        mini_crafter.Env(mode='pomdp', seed=1, length=100), directory,
+        **kwargs)
+    rng = np.random.RandomState(0)
+    env.reset()
+    done = False
+    while not done:
+      _, _, done, _ = env.step(rng.randint(env.action_space.n))
+    env.close()
+    filename, = directory.glob('*.npz')
+    episodes[name] = codec.load_episode(filename)
+  plain, delta = episodes['plain'], episodes['delta']
+  for key in ('image', 'semantic'):
+    assert isinstance(delta[key], codec.DeltaFrames)
+    assert np.array_equal(np.asarray(delta[key]), plain[key])
+  assert np.array_equal(delta['action'], plain['action'])
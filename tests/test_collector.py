@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+import mini_crafter
+from mini_crafter import collector
+
+
+def test_matches_single_envs():
+  with collector.Collector(3, 8, workers=2, seed=5, mode='pomdp') as col:
+    envs = [mini_crafter.Env(seed=5 + i, mode='pomdp') for i in range(3)]
+    obs = col.reset()
+    for i, env in enumerate(envs):
+      assert np.array_equal(obs[i], env.reset())
+    rng = np.random.RandomState(0)
+    for _ in range(10):
+      actions = rng.randint(0, 17, 3)
+      obs, reward, done = col.step(actions)
+      for i, env in enumerate(envs):
+        expected, expected_reward, _, _ = env.step(actions[i])
+        assert np.array_equal(obs[i], expected)
+        assert reward[i] == np.float32(expected_reward)
+    assert len(col) == 8
+
+
+def test_worker_error_propagates_and_keeps_workers_in_sync():
+  with collector.Collector(2, 4, workers=2, seed=0) as col:
+    col.reset()
+    with pytest.raises(IndexError):
+      col.step([99, 0])
+    col.step([0, 0])
+    # An answer left over from the failed step would hide this error.
+    with pytest.raises(IndexError):
+      col.step([0, 99])
+    _, reward, _ = col.step([0, 0])
+    assert reward.shape == (2,)
+
+
+def test_bad_env_arguments_are_reported():
+  with collector.Collector(1, 2, mode='nope') as col:
+    with pytest.raises(ValueError):
+      col.reset()
+
+
+def test_frame_shape_without_env():
+  with collector.Collector(2, 2, size=(32, 48), obs_layout='CHW') as col:
+    assert col.reset().shape == (2, 3, 48, 32)
@@ -0,0 +1,70 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from mini_crafter import dataset
+
+
+def _episode(length, value):
+  return {
+      'image': np.full((length, 4, 4, 3), value, np.uint8),
+      'action': np.arange(length, dtype=np.int64) + 100 * value,
+      'reward': np.full(length, value, np.float32),
+  }
+
+
+def _write(directory, lengths, shard_size=10):
+  with dataset.Writer(directory, shard_size) as writer:
+    for value, length in enumerate(lengths):
+      writer.add(_episode(length, value), f'ep{value}')
+
+
+def test_windows_stay_inside_episodes(tmp_path):
+  _write(tmp_path, [6, 3, 8, 12])
+  data = dataset.Dataset(tmp_path, length=4)
+  assert data.episodes == 3
+  assert data.names == ['ep0', 'ep2', 'ep3']
+  assert len(data) == 3 + 5 + 9
+  for index in range(len(data)):
+    window = data[index]
+    actions = window['action']
+    assert len(actions) == 4
+    assert np.all(np.diff(actions) == 1)
+    assert np.all(window['reward'] == actions[0] // 100)
+
+
+def test_sample_copies_windows(tmp_path):
+  _write(tmp_path, [6, 8, 12])
+  data = dataset.Dataset(tmp_path, length=5, keys=('action',))
+  batch = data.sample(32, np.random.RandomState(0))
+  assert batch['action'].shape == (32, 5)
+  assert np.all(np.diff(batch['action'], axis=1) == 1)
+  batch['action'][:] = -1
+  assert data[0]['action'][0] >= 0
+
+
+def test_pickled_dataset_reads_the_same_windows(tmp_path):
+  _write(tmp_path, [6, 8])
+  data = dataset.Dataset(tmp_path, length=3)
+  other = pickle.loads(pickle.dumps(data))
+  for index in range(len(data)):
+    assert np.array_equal(data[index]['image'], other[index]['image'])
+
+
+def test_appends_after_a_crashed_writer(tmp_path):
+  _write(tmp_path, [6])
+  crashed = dataset.Writer(tmp_path, 10)
+  crashed.add(_episode(8, 5))  # Opens shard 1 but never closes.
+  del crashed
+  _write(tmp_path, [7])
+  data = dataset.Dataset(tmp_path, length=6)
+  assert data.episodes == 2
+  assert data[len(data) - 1]['action'][-1] == 6
+
+
+def test_rejects_mismatched_columns(tmp_path):
+  with dataset.Writer(tmp_path) as writer:
+    writer.add(_episode(4, 0))
+    with pytest.raises(ValueError):
+      writer.add({'action': np.arange(4)})
@@ -0,0 +1,77 @@
+import shutil
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from mini_crafter import constants
+from mini_crafter import engine
+
+
+@pytest.fixture
+def assets(tmp_path):
+  directory = tmp_path / 'assets'
+  shutil.copytree(constants.root / 'assets', directory)
+  return directory
+
+
+def test_lru_evicts_oldest_within_budget():
+  evicted = []
+  cache = engine.LRUCache(10, evicted.append)
+  cache.put('a', 'A', 4)
+  cache.put('b', 'B', 4)
+  assert cache.get('a') == 'A'
+  cache.put('c', 'C', 4)
+  assert evicted == ['b']
+  assert 'b' not in cache and cache.bytes == 8
+  cache.put('huge', 'H', 11)
+  assert 'huge' not in cache
+  cache.resize(4)
+  assert evicted == ['b', 'a'] and list(cache._entries) == ['c']
+  cache.clear()
+  assert evicted == ['b', 'a', 'c'] and not len(cache)
+  stats = cache.stats()
+  assert (stats['hits'], stats['evictions']) == (1, 2)
+
+
+def test_shared_textures_are_keyed_by_budget():
+  directory = constants.root / 'assets'
+  default = engine.Textures.shared(directory)
+  small = engine.Textures.shared(directory, 1 << 20)
+  assert engine.Textures.shared(directory, 16 << 20) is default
+  assert small is not default
+  assert default.cache.max_bytes == 16 << 20
+  assert small.cache.max_bytes == 1 << 20
+
+
+def test_prewarm_is_forgotten_on_eviction():
+  textures = engine.Textures(constants.root / 'assets', 200000)
+  textures.prewarm([(9, 9)])
+  assert len(textures._warm) == 1
+  # 64x64 textures of every name do not fit, so the size is never warm.
+  textures.prewarm([(64, 64)])
+  assert not textures._warm
+  textures.cache.clear()
+  textures.prewarm([(9, 9)])
+  misses = textures.stats()['misses']
+  textures.prewarm([(9, 9)])
+  assert textures.stats()['misses'] == misses
+
+
+def test_stale_atlas_falls_back_to_pngs(assets):
+  assert engine._load_atlas(assets) is not None
+  grass = np.array(Image.open(assets / 'grass.png'))
+  Image.fromarray(255 - grass).save(assets / 'grass.png')
+  assert engine._load_atlas(assets) is None
+  textures = engine.Textures(assets)
+  expected = (255 - grass).transpose((1, 0) + tuple(range(2, grass.ndim)))
+  assert np.array_equal(textures.get('grass', expected.shape[:2]), expected)
+  engine.build_atlas(assets)
+  atlas = engine._load_atlas(assets)
+  assert np.array_equal(atlas['grass'], expected)
+
+
+def test_added_png_invalidates_atlas(assets):
+  shutil.copy(assets / 'grass.png', assets / 'grass-2.png')
+  assert engine._load_atlas(assets) is None
+  assert 'grass-2' in engine.Textures(assets)._originals
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+import mini_crafter
+from mini_crafter import objects
+
+
+def _clear_front(env):
+  player = env._player
+  target = tuple(np.array(player.pos) + np.array(player.facing))
+  obj = env._world[target][1]
+  if obj:
+    env._world.remove(obj)
+  env._world[target] = 'grass'
+  return target
+
+
+@pytest.mark.parametrize('cls', [objects.Zombie, objects.Skeleton])
+def test_defeating_a_creature_skips_disabled_achievements(cls):
+  env = mini_crafter.Env(mode='pomdp', seed=0)
+  env.reset()
+  target = _clear_front(env)
+  creature = cls(env._world, target, env._player)
+  creature.health = 1
+  env._world.add(creature)
+  achievements = env._player.achievements.copy()
+  env.step(mini_crafter.constants.actions.index('do'))
+  assert creature.health <= 0
+  # defeat_zombie and defeat_skeleton are disabled in data.yaml.
+  assert env._player.achievements == achievements
+
+
+def test_large_mode_uses_the_requested_area():
+  env = mini_crafter.Env(mode='large', area=(96, 96), seed=0)
+  obs = env.reset()
+  assert tuple(env._world.area) == (96, 96)
+  assert obs.shape == (64, 64, 3)
+  rng = np.random.RandomState(0)
+  for _ in range(50):
+    obs, _, done, _ = env.step(rng.randint(env.action_space.n))
+    if done:
+      break
+  assert obs.shape == (64, 64, 3)
+
+
+@pytest.mark.parametrize('mode', ['mdp', 'pomdp'])
+def test_step_many_matches_sequential_steps(mode):
+  single = mini_crafter.Env(mode=mode, seed=4)
+  batched = mini_crafter.Env(mode=mode, seed=4)
+  single.reset()
+  batched.reset()
+  rng = np.random.RandomState(0)
+  for _ in range(40):
+    actions = rng.randint(0, 17, 5)
+    reward = 0.0
+    for action in actions:
+      obs, step_reward, done, info = single.step(action)
+      reward += step_reward
+      if done:
+        break
+    many = batched.step_many(actions)
+    assert np.array_equal(obs, many[0])
+    assert many[1] == pytest.approx(reward)
+    assert many[2] == done
+    assert many[3]['achievements'] == info['achievements']
+    assert batched.state_hash() == single.state_hash()
+    if done:
+      break
+
+
+def test_step_many_stops_when_the_episode_ends():
+  env = mini_crafter.Env(seed=0, length=5)
+  env.reset()
+  _, _, done, _ = env.step_many([0] * 10)
+  assert done and env._step == 5
+
+
+def test_action_repeat_is_step_many():
+  repeated = mini_crafter.Env(mode='pomdp', seed=1, action_repeat=3)
+  batched = mini_crafter.Env(mode='pomdp', seed=1)
+  repeated.reset()
+  batched.reset()
+  for action in np.random.RandomState(0).randint(0, 17, 20):
+    obs, reward, done, _ = repeated.step(action)
+    many = batched.step_many([action] * 3)
+    assert np.array_equal(obs, many[0]) and reward == many[1]
+    assert repeated._step == batched._step
@@ -0,0 +1,27 @@
+from mini_crafter import evaluate
+
+
+def _run(processes):
+  return evaluate.evaluate(
+      evaluate.RandomPolicy(), range(6), processes=processes, batch=2,
+      length=60)
+
+
+def test_results_do_not_depend_on_processes():
+  serial, parallel = _run(1), _run(3)
+  assert serial['episodes'] == parallel['episodes']
+  for name, summary in serial['conditions'].items():
+    other = parallel['conditions'][name]
+    assert summary['score'] == other['score']
+    assert summary['success_rates'] == other['success_rates']
+
+
+def test_summaries_cover_every_condition():
+  result = _run(1)
+  assert sorted(result['conditions']) == [
+      'mdp', 'mdp-peaceful', 'pomdp', 'pomdp-peaceful']
+  assert result['overall']['episodes'] == 24
+  assert all(
+      summary['episodes'] == 6 for summary in result['conditions'].values())
+  assert result['overall']['steps'] == sum(
+      episode['length'] for episode in result['episodes'])
@@ -0,0 +1,66 @@
+import numpy as np
+
+import mini_crafter
+from mini_crafter import events
+
+
+def _do(env):
+  return env.step(mini_crafter.constants.actions.index('do'))
+
+
+def _face_tree(env):
+  player = env._player
+  target = tuple(np.array(player.pos) + np.array(player.facing))
+  obj = env._world[target][1]
+  if obj:
+    env._world.remove(obj)
+  env._world[target] = 'tree'
+
+
+def _wood_events(env):
+  return [
+      event for event in env.events
+      if type(event) is events.Achievement and event.name == 'collect_wood']
+
+
+def test_reset_starts_without_events():
+  env = mini_crafter.Env(mode='pomdp', seed=0)
+  env.reset()
+  assert env.events == []
+
+
+def test_collecting_emits_typed_events_and_rewards_once():
+  env = mini_crafter.Env(mode='pomdp', seed=0, peaceful=True)
+  env.reset()
+  rewards = []
+  for _ in range(5):
+    _face_tree(env)
+    before = env._player.achievements['collect_wood']
+    _, reward, _, _ = _do(env)
+    count = env._player.achievements['collect_wood']
+    expected = [events.Achievement('collect_wood', count)] * (count > before)
+    assert _wood_events(env) == expected
+    if count > before:
+      rewards.append(reward)
+  assert len(rewards) == 5
+  # Only the first collection unlocks the achievement.
+  assert rewards[0] >= 0.9 and all(reward < 0.9 for reward in rewards[1:])
+
+
+def test_step_many_keeps_the_events_of_every_action():
+  env = mini_crafter.Env(mode='pomdp', seed=0, peaceful=True)
+  env.reset()
+  _face_tree(env)
+  previous, snapshot = env.events, list(env.events)
+  before = env._player.achievements.copy()
+  # The tree turns into grass, which then yields saplings now and then.
+  env.step_many([mini_crafter.constants.actions.index('do')] * 40)
+  after = env._player.achievements
+  expected = [
+      events.Achievement(name, count) for name in after
+      for count in range(before[name] + 1, after[name] + 1)]
+  unlocked = [
+      event for event in env.events if type(event) is events.Achievement]
+  assert sorted(unlocked) == sorted(expected)
+  assert after['collect_wood'] == 1 and after['collect_sapling'] >= 1
+  assert previous == snapshot and previous is not env.events
@@ -0,0 +1,28 @@
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+import mini_crafter
+
+gym = pytest.importorskip('gym')
+root = pathlib.Path(__file__).parent.parent
+
+
+def test_env_is_gym_env():
+  assert isinstance(mini_crafter.Env(), gym.Env)
+
+
+def test_ids_registered_on_import():
+  env = gym.make('CrafterReward-v1')
+  assert isinstance(env.unwrapped, mini_crafter.Env)
+  env = gym.make('CrafterNoReward-v1')
+  assert not env.unwrapped._reward
+
+
+def test_recorder_does_not_import_imageio():
+  code = (
+      'import sys, mini_crafter.recorder; '
+      'sys.exit("imageio" in sys.modules)')
+  assert subprocess.run([sys.executable, '-c', code], cwd=root).returncode == 0
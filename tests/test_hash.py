@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+import mini_crafter
+
+
+def _full_hash(env):
+  world = env._world
+  world._hash = None
+  return world.hash ^ env._player.inventory.hash
+
+
+@pytest.mark.parametrize('mode', ['mdp', 'pomdp'])
+def test_incremental_hash_equals_full_recompute(mode):
+  env = mini_crafter.Env(mode=mode, seed=2)
+  env.reset()
+  env.state_hash()
+  rng = np.random.RandomState(0)
+  for step in range(400):
+    _, _, done, _ = env.step(rng.randint(env.action_space.n))
+    if step % 20 == 0 or done:
+      incremental = env.state_hash()
+      assert incremental == _full_hash(env)
+    if done:
+      env.reset()
+
+
+def test_hash_distinguishes_and_restores_states():
+  env = mini_crafter.Env(mode='pomdp', seed=2)
+  env.reset()
+  state, before = env.get_state(), env.state_hash()
+  env.step(mini_crafter.constants.actions.index('move_left'))
+  env.step(mini_crafter.constants.actions.index('do'))
+  assert env.state_hash() != before
+  env.set_state(state)
+  assert env.state_hash() == before == _full_hash(env)
+
+
+def test_inventory_hash_tracks_items():
+  env = mini_crafter.Env(seed=0)
+  env.reset()
+  inventory = env._player.inventory
+  before = inventory.hash
+  inventory['wood'] += 1
+  assert inventory.hash != before
+  inventory['wood'] -= 1
+  assert inventory.hash == before
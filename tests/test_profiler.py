@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+import mini_crafter
+
+
+def test_profile_reports_phases_and_resets():
+  env = mini_crafter.Env(mode='pomdp', seed=0, profile=True)
+  env.reset()
+  for _ in range(20):
+    env.step(0)
+  report = env.profile(reset=True)
+  assert report['reset']['count'] == 1
+  assert report['step']['count'] == 20
+  assert report['balance']['count'] == 2
+  for phase in report.values():
+    assert phase['total'] >= 0
+    assert sum(phase['hist']['counts']) == phase['count']
+  env.step(0)
+  assert env.profile()['step']['count'] == 1
+
+
+def test_export_trace_writes_chrome_json(tmp_path):
+  env = mini_crafter.Env(seed=0, profile=True)
+  env.reset()
+  env.step(0)
+  env.export_trace(tmp_path / 'trace.json')
+  trace = json.loads((tmp_path / 'trace.json').read_text())
+  names = {event['name'] for event in trace['traceEvents']}
+  assert {'reset', 'worldgen', 'step', 'compose'} <= names
+
+
+def test_profiling_is_opt_in():
+  env = mini_crafter.Env(seed=0)
+  env.reset()
+  env.step(0)
+  assert env.profile() == {}
+  with pytest.raises(RuntimeError):
+    env.export_trace('unused.json')
@@ -0,0 +1,104 @@
+import gc
+
+import imageio
+import numpy as np
+
+import mini_crafter
+from mini_crafter import recorder
+from mini_crafter import stats
+
+
+def _run(env, episodes=1, seed=0):
+  rng = np.random.RandomState(seed)
+  for _ in range(episodes):
+    env.reset()
+    done = False
+    while not done:
+      _, _, done, _ = env.step(rng.randint(env.action_space.n))
+
+
+def test_video_keeps_every_frame_by_default(tmp_path):
+  env = recorder.VideoRecorder(
+      mini_crafter.Env(length=40), tmp_path, size=(64, 64), queue_size=1)
+  _run(env)
+  env.close()
+  assert env.dropped_frames == 0
+  filename, = tmp_path.glob('*.mp4')
+  with imageio.get_reader(filename) as reader:
+    assert reader.count_frames() == 41
+
+
+def test_recorder_batches_stats_and_flushes_on_close(tmp_path):
+  env = recorder.Recorder(
+      mini_crafter.Env(length=20), tmp_path, save_video=False,
+      save_episode=False)
+  _run(env, episodes=3)
+  assert not stats.load(tmp_path).get('length', ())
+  env.close()
+  assert stats.load(tmp_path)['length'].tolist() == [20, 20, 20]
+
+
+def test_fused_recorder_writes_what_the_chain_writes(tmp_path):
+  def make():
+    return mini_crafter.Env(mode='pomdp', seed=3, length=60)
+  fused = recorder.Recorder(
+      make(), tmp_path / 'fused', video_size=(64, 64), save_replay=True)
+  chain = make()
+  for cls in (recorder.ReplayRecorder, recorder.StatsRecorder):
+    chain = cls(chain, tmp_path / 'chain')
+  chain = recorder.VideoRecorder(chain, tmp_path / 'chain', size=(64, 64))
+  chain = recorder.EpisodeRecorder(chain, tmp_path / 'chain')
+  for env in (fused, chain):
+    _run(env)
+    env.close()
+  # Files are named by the time the episode ended and stats by the worker.
+  files = {
+      name: {p.name.split('-', 1)[1]: p for p in (tmp_path / name).glob('2*')}
+      for name in ('fused', 'chain')}
+  assert files['fused'].keys() == files['chain'].keys()
+  fused_stats = stats.load(tmp_path / 'fused')
+  chain_stats = stats.load(tmp_path / 'chain')
+  assert fused_stats.keys() == chain_stats.keys()
+  for key in fused_stats:
+    assert np.array_equal(fused_stats[key], chain_stats[key]), key
+  for suffix, filename in files['fused'].items():
+    if filename.suffix == '.mp4':
+      with imageio.get_reader(filename) as reader:
+        assert reader.count_frames() == 61
+      continue
+    with np.load(filename) as a, np.load(files['chain'][suffix]) as b:
+      assert sorted(a.files) == sorted(b.files)
+      for key in a.files:
+        assert np.array_equal(a[key], b[key]), key
+
+
+def test_buffered_stats_survive_without_close(tmp_path):
+  env = recorder.StatsRecorder(
+      mini_crafter.Env(length=20), tmp_path, flush_every=100)
+  _run(env, episodes=2)
+  del env
+  gc.collect()
+  assert len(stats.load(tmp_path)['length']) == 2
+
+
+def test_episode_columns_match_the_steps_across_chunks(tmp_path):
+  env = recorder.EpisodeRecorder(
+      mini_crafter.Env(mode='pomdp', seed=2, length=150), tmp_path, chunk=64)
+  rng = np.random.RandomState(0)
+  images, actions, rewards = [env.reset()], [0], [0.0]
+  done = False
+  while not done:
+    action = rng.randint(env.action_space.n)
+    obs, reward, done, info = env.step(action)
+    images.append(obs)
+    actions.append(action)
+    rewards.append(reward)
+  env.close()
+  filename, = tmp_path.glob('*.npz')
+  with np.load(filename, allow_pickle=False) as episode:
+    assert np.array_equal(episode['image'], np.stack(images))
+    assert np.array_equal(episode['action'], actions)
+    assert np.allclose(episode['reward'], rewards)
+    assert episode['done'][-1] and not episode['done'][:-1].any()
+    assert episode['achievement_collect_wood'][-1] == (
+        info['achievements']['collect_wood'])
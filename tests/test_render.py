@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+import mini_crafter
+
+
+def _play(env, steps, seed=0):
+  rng = np.random.RandomState(seed)
+  for _ in range(steps):
+    env.step(rng.randint(env.action_space.n))
+
+
+@pytest.mark.parametrize('mode', ['mdp', 'pomdp'])
+def test_channel_first_is_the_transposed_frame(mode):
+  hwc = mini_crafter.Env(mode=mode, seed=1)
+  chw = mini_crafter.Env(mode=mode, seed=1, obs_layout='CHW')
+  assert np.array_equal(hwc.reset().transpose((2, 0, 1)), chw.reset())
+  for action in np.random.RandomState(0).randint(0, 17, 30):
+    obs, _, _, _ = chw.step(action)
+    assert obs.flags.c_contiguous
+    assert np.array_equal(hwc.step(action)[0].transpose((2, 0, 1)), obs)
+  assert chw.observation_space.shape == (3, 64, 64)
+
+
+def test_render_into_out_buffer():
+  env = mini_crafter.Env(mode='pomdp', seed=1)
+  env.reset()
+  out = np.empty((96, 128, 3), np.uint8)
+  assert env.render((128, 96), out=out) is out
+  assert np.array_equal(out, env.render((128, 96)))
+  with pytest.raises(ValueError):
+    env.render((128, 96), out=np.empty((128, 96, 3), np.uint8))
+
+
+def test_repeated_renders_of_a_step_are_identical():
+  env = mini_crafter.Env(mode='pomdp', seed=1)
+  env.reset()
+  _play(env, 220)
+  assert env._world.daylight < 0.5
+  assert np.array_equal(env.render(), env.render())
+
+
+@pytest.mark.parametrize('mode', ['mdp', 'pomdp'])
+def test_cached_frames_equal_fresh_frames(mode):
+  cached = mini_crafter.Env(mode=mode, seed=2, frame_cache=16 << 20)
+  fresh = mini_crafter.Env(mode=mode, seed=2, frame_cache=16 << 20)
+  cached.reset()
+  fresh.reset()
+  rng = np.random.RandomState(0)
+  for _ in range(300):
+    action = rng.choice([0, 0, 1, 2, 3, 4, 5, rng.randint(17)])
+    fresh._frame_cache.clear()
+    obs, _, done, _ = cached.step(action)
+    assert np.array_equal(obs, fresh.step(action)[0])
+    if done:
+      break
+  assert cached.frame_stats()['hits'] > 0
+
+
+def test_frame_cache_ignores_changes_out_of_view():
+  env = mini_crafter.Env(mode='large', area=(64, 64), seed=0, frame_cache=1e7)
+  env.reset()
+  first = env.render()
+  hits = env.frame_stats()['hits']
+  world, player = env._world, env._player
+  far = tuple(int(x) for x in (np.array(player.pos) + 20) % 64)
+  if np.abs(np.array(far) - player.pos).max() <= 5:
+    far = (0, 0)
+  world[far] = 'stone' if world[far][0] != 'stone' else 'grass'
+  assert np.array_equal(env.render(), first)
+  assert env.frame_stats()['hits'] == hits + 1
+  near = tuple(np.array(player.pos) + (1, 0))
+  world[near] = 'stone' if world[near][0] != 'stone' else 'grass'
+  assert not np.array_equal(env.render(), first)
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+import mini_crafter
+from mini_crafter import recorder
+from mini_crafter import replay
+
+
+def _record(directory, steps=300, **kwargs):
+  env = recorder.ReplayRecorder(
+      mini_crafter.Env(seed=7, length=steps, mode='pomdp', **kwargs),
+      directory, checksum_every=50, snapshot_every=100)
+  rng = np.random.RandomState(1)
+  frames, done = [env.reset()], False
+  while not done:
+    obs, _, done, _ = env.step(rng.randint(env.action_space.n))
+    frames.append(obs)
+  filename, = directory.glob('*.npz')
+  return filename, frames
+
+
+def test_replay_from_start_matches_recording(tmp_path):
+  filename, frames = _record(tmp_path)
+  steps = 0
+  for out in replay.replay(filename, ('image',)):
+    assert np.array_equal(out['image'], frames[out['step']])
+    steps += 1
+  assert steps == len(frames)
+
+
+def test_seek_from_snapshot_matches_recorded_night_frames(tmp_path):
+  # Steps 230 to 260 are at night, where frames carry render noise.
+  filename, frames = _record(tmp_path)
+  outputs = list(replay.replay(filename, ('image',), start=230, stop=260))
+  assert [out['step'] for out in outputs] == list(range(230, 261))
+  for out in outputs:
+    assert np.array_equal(out['image'], frames[out['step']])
+
+
+def test_divergence_is_detected(tmp_path):
+  filename, _ = _record(tmp_path, steps=120)
+  data = replay.load(filename)
+  data['actions'] = data['actions'].copy()
+  data['actions'][:60] = (data['actions'][:60] + 1) % 17
+  with pytest.raises(RuntimeError):
+    list(replay.replay(data, ('semantic',)))
+
+
+def test_snapshots_are_not_pickled(tmp_path):
+  filename, _ = _record(tmp_path, steps=120)
+  with np.load(filename, allow_pickle=False) as data:
+    for step in data['snapshot_steps']:
+      assert data[f'snapshot_{step}'].dtype == np.uint8
+
+
+def test_replay_keeps_frame_cache_settings(tmp_path):
+  filename, frames = _record(
+      tmp_path, steps=260, frame_cache=16 << 20, daylight_levels=4)
+  for out in replay.replay(filename, ('image',), start=200):
+    assert np.array_equal(out['image'], frames[out['step']])
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+import mini_crafter
+
+
+def _play(env, steps, seed=0):
+  rng = np.random.RandomState(seed)
+  for _ in range(steps):
+    _, _, done, _ = env.step(rng.randint(env.action_space.n))
+    if done:
+      env.reset()
+
+
+def _rollout(env, steps, seed=1):
+  rng = np.random.RandomState(seed)
+  trace = []
+  for _ in range(steps):
+    _, reward, done, info = env.step(rng.randint(env.action_space.n))
+    trace.append((
+        env._checksum(), info['semantic'].tobytes(), reward, done,
+        tuple(info['inventory'].values())))
+  return trace
+
+
+@pytest.mark.parametrize('mode', ['mdp', 'pomdp'])
+def test_save_load_round_trip(mode):
+  env = mini_crafter.Env(seed=3, mode=mode)
+  env.reset()
+  _play(env, 300)
+  state = env.get_state()
+  other = mini_crafter.Env(seed=99, mode=mode)
+  other.reset()
+  other.set_state(state.tobytes())
+  assert np.array_equal(other.get_state(), state)
+  assert other.state_hash() == env.state_hash()
+
+
+@pytest.mark.parametrize('mode', ['mdp', 'pomdp'])
+def test_restored_state_continues_identically(mode):
+  env = mini_crafter.Env(seed=3, mode=mode)
+  env.reset()
+  _play(env, 300)
+  state = env.get_state()
+  expected = _rollout(env, 200)
+  env.set_state(state)
+  assert _rollout(env, 200) == expected
+  other = mini_crafter.Env(seed=5, mode=mode)
+  other.reset()
+  other.set_state(state)
+  assert _rollout(other, 200) == expected
+
+
+def test_rejects_foreign_buffers():
+  env = mini_crafter.Env(mode='pomdp')
+  env.reset()
+  with pytest.raises(ValueError):
+    env.set_state(np.zeros(100, np.uint8))
+  small = mini_crafter.Env(mode='mdp')
+  small.reset()
+  with pytest.raises(ValueError):
+    env.set_state(small.get_state())
@@ -0,0 +1,63 @@
+import json
+
+import numpy as np
+import pytest
+
+from mini_crafter import stats
+
+
+def _episode(length, **achievements):
+  episode = {'length': length, 'reward': 1.5}
+  for name, count in achievements.items():
+    episode[f'achievement_{name}'] = count
+  return episode
+
+
+def test_workers_are_aggregated(tmp_path):
+  first = stats.Writer(tmp_path, 'a', flush_every=2)
+  second = stats.Writer(tmp_path, 'b', flush_every=1)
+  first.add(_episode(10, collect_wood=1, place_table=0))
+  second.add(_episode(20, collect_wood=0, place_table=2))
+  first.add(_episode(30, collect_wood=3, place_table=1))
+  first.close()
+  second.close()
+  columns = stats.load(tmp_path)
+  assert sorted(columns['length'].tolist()) == [10, 20, 30]
+  rates = stats.success_rates(columns)
+  assert rates == pytest.approx(
+      {'collect_wood': 200 / 3, 'place_table': 200 / 3})
+  expected = np.exp(np.mean(np.log(1 + np.array([200 / 3, 200 / 3])))) - 1
+  assert np.isclose(stats.score(columns), expected)
+
+
+def test_binary_and_jsonl_agree(tmp_path):
+  writer = stats.Writer(tmp_path, 'a', flush_every=1)
+  for length in range(5):
+    writer.add(_episode(length, collect_wood=length % 2))
+  writer.close()
+  binary = stats.load(tmp_path)
+  (tmp_path / 'stats-a.bin').unlink()
+  assert all(
+      np.array_equal(binary[key], values)
+      for key, values in stats.load(tmp_path).items())
+
+
+def test_legacy_jsonl_and_truncated_binary(tmp_path):
+  legacy = [_episode(7, collect_wood=1)]
+  (tmp_path / 'stats.jsonl').write_text(
+      ''.join(json.dumps(episode) + '\n' for episode in legacy))
+  writer = stats.Writer(tmp_path, 'b', flush_every=1)
+  writer.add(_episode(8, collect_wood=0))
+  writer.add(_episode(9, collect_wood=0))
+  writer.close()
+  # A writer killed mid-batch leaves a partial row, which is skipped.
+  with (tmp_path / 'stats-b.bin').open('ab') as f:
+    f.write(b'\0\0\0')
+  columns = stats.load(tmp_path)
+  assert sorted(columns['length'].tolist()) == [7, 8, 9]
+  assert stats.success_rates(columns) == pytest.approx(
+      {'collect_wood': 100 / 3})
+
+
+def test_score_without_achievements_is_nan():
+  assert np.isnan(stats.score({'length': np.array([1.0])}))
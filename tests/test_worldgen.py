@@ -0,0 +1,68 @@
+import numpy as np
+
+import mini_crafter
+from mini_crafter import worldgen
+
+
+def test_process_pool_matches_serial_layouts():
+  seeds = np.arange(12) * 7919
+  serial = worldgen.generate_layouts(seeds, (15, 15))
+  pooled = worldgen.generate_layouts(
+      seeds, (15, 15), processes=2, chunksize=5)
+  for a, b in zip(serial, pooled):
+    assert np.array_equal(a, b)
+  grids, overlays, attempts = serial
+  assert grids.shape == overlays.shape == (12, 15, 15)
+  assert attempts.shape == (12,) and (attempts >= 1).all()
+
+
+def test_reset_reports_worldgen_telemetry():
+  env = mini_crafter.Env(mode='pomdp', seed=3)
+  _, info = env.reset(return_info=True)
+  telemetry = info['worldgen']
+  assert telemetry['attempts'] >= 1
+  assert sum(telemetry['rejections'].values()) == telemetry['attempts'] - 1
+  assert all(seconds >= 0 for seconds in telemetry['time'].values())
+
+
+def test_cached_layouts_match_generated_ones():
+  cache = mini_crafter.engine.LRUCache(64 << 20)
+  for episode in range(3):
+    cached = mini_crafter.Env(mode='pomdp', seed=5, layout_cache=cache)
+    fresh = mini_crafter.Env(mode='pomdp', seed=5)
+    for _ in range(3):
+      _, info = cached.reset(return_info=True)
+      fresh.reset()
+      assert info['worldgen'].get('cached', False) == (episode > 0)
+      assert np.array_equal(cached.render(), fresh.render())
+      assert cached.state_hash() == fresh.state_hash()
+  assert cache.stats()['hits'] == 6
+
+
+def _component(allowed, start):
+  seen, todo = {start}, [start]
+  while todo:
+    x, y = todo.pop()
+    for n in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+      inside = 0 <= n[0] < allowed.shape[0] and 0 <= n[1] < allowed.shape[1]
+      if inside and allowed[n] and n not in seen:
+        seen.add(n)
+        todo.append(n)
+  return seen
+
+
+def test_frontier_growth_stays_connected_within_budget():
+  rng = np.random.RandomState(0)
+  for _ in range(50):
+    allowed = rng.uniform(size=(24, 20)) < 0.7
+    start = (int(rng.randint(24)), int(rng.randint(20)))
+    allowed[start] = True
+    component = _component(allowed, start)
+    full = worldgen._frontier_grow(start, allowed, allowed.size, rng)
+    assert set(zip(*map(list, np.nonzero(full)))) == component
+    budget = int(rng.randint(1, 40))
+    grown = worldgen._frontier_grow(start, allowed, budget, rng)
+    cells = set(zip(*map(list, np.nonzero(grown))))
+    assert start in cells and cells <= component
+    assert len(cells) == len(_component(grown, start))
+    assert min(budget, len(component)) <= len(cells) <= budget + 3